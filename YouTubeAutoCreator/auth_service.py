@@ -0,0 +1,139 @@
+import os
+import json
+import asyncio
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+from playwright.async_api import async_playwright
+
+from session_validator import validator
+from upload_session import BROWSER_ARGS, BROWSER_CHANNEL
+
+LOGIN_URL = "https://accounts.google.com/ServiceLogin?service=youtube"
+LOGIN_TIMEOUT_MS = int(os.getenv("LOGIN_TIMEOUT_MS", "180000"))  # time allowed for manual steps (2FA etc.)
+LOGIN_CONCURRENCY = int(os.getenv("LOGIN_CONCURRENCY", "2"))  # login windows open at once
+
+SAME_SITE = {"strict": "Strict", "lax": "Lax", "none": "None", "no_restriction": "None", "unspecified": "Lax"}
+
+
+# -----------------------------
+# Storage state (pure JSON)
+# -----------------------------
+def _write_json(path, data):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}-")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+def cookies_to_storage_state(cookies, origins=None):
+    """Playwright storage-state dict from a cookie list (Playwright or browser-extension export)"""
+    state_cookies = []
+    for c in cookies:
+        expires = c.get("expires", c.get("expirationDate", -1))
+        same_site = SAME_SITE.get(str(c.get("sameSite", "lax")).lower(), "Lax")
+        state_cookies.append({
+            "name": c["name"],
+            "value": c["value"],
+            "domain": c["domain"],
+            "path": c.get("path", "/"),
+            "expires": -1 if c.get("session") or expires is None else float(expires),
+            "httpOnly": bool(c.get("httpOnly", False)),
+            "secure": bool(c.get("secure", False)) or same_site == "None",
+            "sameSite": same_site,
+        })
+    return {"cookies": state_cookies, "origins": origins or []}
+
+
+def convert_cookie_file(cookie_file, storage_file):
+    """Cookie JSON file -> storage-state JSON file, no browser involved"""
+    cookies = json.loads(Path(cookie_file).read_text(encoding="utf-8"))
+    _write_json(storage_file, cookies_to_storage_state(cookies))
+    return Path(storage_file)
+
+
+# -----------------------------
+# In-process login service
+# -----------------------------
+class AuthService:
+    """Google/YouTube logins inside the bot's own event loop.
+
+    One Playwright instance and browser are shared by every login; each
+    login gets its own context, and that same context writes the cookie
+    and storage-state files. Logins for one user are serialised, and at
+    most LOGIN_CONCURRENCY login windows are open at a time.
+    """
+
+    def __init__(self, headless: bool = False):
+        self.headless = headless
+        self._playwright = None
+        self._browser = None
+        self._start_lock = asyncio.Lock()
+        self._slots = asyncio.Semaphore(LOGIN_CONCURRENCY)
+        self._user_locks = {}
+
+    async def _get_browser(self):
+        async with self._start_lock:
+            if self._browser is None or not self._browser.is_connected():
+                if self._playwright is None:
+                    self._playwright = await async_playwright().start()
+                self._browser = await self._playwright.chromium.launch(
+                    channel=BROWSER_CHANNEL, headless=self.headless, args=BROWSER_ARGS
+                )
+            return self._browser
+
+    async def close(self):
+        if self._browser is not None:
+            await self._browser.close()
+            self._browser = None
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+    async def login(self, user_id, email: Optional[str], password: Optional[str], cookie_file: Path, storage_file: Path):
+        """Sign in and save both files from the same browser context; raises on failure"""
+        browser = await self._get_browser()
+        async with self._slots:
+            context = await browser.new_context(no_viewport=True)
+            try:
+                page = await context.new_page()
+                await page.goto(LOGIN_URL, timeout=120000, wait_until="domcontentloaded")
+                if email and password:
+                    try:
+                        await page.fill('input[type="email"]', email)
+                        await page.click('button:has-text("Next")')
+                        await page.wait_for_selector('input[type="password"]', timeout=10000)
+                        await page.fill('input[type="password"]', password)
+                        await page.click('button:has-text("Next")')
+                    except Exception:
+                        print(f"⚠️ Automated login failed for user {user_id}. Waiting for manual login.")
+
+                await page.wait_for_selector("#avatar-btn", timeout=LOGIN_TIMEOUT_MS)
+                state = await context.storage_state()
+            finally:
+                await context.close()
+
+        _write_json(cookie_file, state["cookies"])
+        _write_json(storage_file, state)
+        validator.invalidate(user_id)
+        print(f"✅ Login and storage state ready for user {user_id}.")
+
+    async def ensure_session(self, user_id, email: Optional[str], password: Optional[str],
+                             cookie_file: Path, storage_file: Path):
+        """Log in only if the saved session is gone; concurrent calls for one user share a single login"""
+        lock = self._user_locks.setdefault(user_id, asyncio.Lock())
+        async with lock:
+            if await validator.ais_valid(user_id, storage_file, cookie_file):
+                # Live cookies but no storage file yet (e.g. an exported cookie file): convert, no browser needed
+                if not Path(storage_file).exists():
+                    convert_cookie_file(cookie_file, storage_file)
+                print(f"✅ Saved session still valid for user {user_id}. Skipping login.")
+                return False
+            await self.login(user_id, email, password, cookie_file, storage_file)
+            return True
+
+
+auth_service = AuthService()
@@ -0,0 +1,155 @@
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+from multiprocessing import Manager
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import nullcontext
+from pathlib import Path
+
+from render_profiles import available_cores
+
+MANIFEST_FILE = Path("output") / "batch_manifest.json"
+
+
+# -----------------------------
+# Worker process
+# -----------------------------
+def _init_worker(network_limiter, render_threads):
+    os.environ["RENDER_THREADS"] = str(render_threads)
+    import main
+    main.set_network_limiter(network_limiter)
+
+
+def render_topic(topic, image_source_choice, render_backend, render_profile):
+    """Render one topic in a worker process (no upload), returns the output path"""
+    from main import VideoCreator
+    creator = VideoCreator()
+    started = time.perf_counter()
+    output_path = creator.create_video(
+        topic,
+        image_source_choice,
+        render_backend=render_backend,
+        render_profile=render_profile,
+        upload=False
+    )
+    if not output_path:
+        raise RuntimeError("create_video returned no output")
+    return {"output": output_path, "seconds": round(time.perf_counter() - started, 1)}
+
+
+# -----------------------------
+# Manifest
+# -----------------------------
+def write_manifest(manifest, path):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".manifest-")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, path)
+
+
+def read_topics(source):
+    """Topics from a file (one per line, # comments) or stdin when source is '-'"""
+    lines = sys.stdin.read().splitlines() if source == "-" else Path(source).read_text(encoding="utf-8").splitlines()
+    topics = [line.strip() for line in lines if line.strip() and not line.strip().startswith("#")]
+    return list(dict.fromkeys(topics))
+
+
+# -----------------------------
+# Batch renderer
+# -----------------------------
+def prefetch_scripts(topics, batch_size=None):
+    """Generate every script up front in batched requests; workers then hit the shared script cache"""
+    from main import VideoCreator, SCRIPT_BATCH_SIZE
+    batch_size = SCRIPT_BATCH_SIZE if batch_size is None else batch_size
+    if batch_size > 1 and len(topics) > 1:
+        VideoCreator().generate_scripts(topics, batch_size=batch_size)
+
+
+def batch_render(topics, workers=None, image_source_choice="2", render_backend=None, render_profile=None,
+                 network_limit=8, manifest_path=MANIFEST_FILE, upload=False, upload_backend=None,
+                 script_batch_size=None):
+    """Render many topics in a process pool; returns the manifest {topic: status dict}
+
+    With upload=True each finished video is handed to a background UploadWorker
+    straight away, so uploading overlaps with the renders still in progress.
+    """
+    workers = max(1, min(workers or available_cores(), len(topics)))
+    render_threads = max(1, available_cores() // workers)
+    manifest = {topic: {"status": "queued"} for topic in topics}
+    write_manifest(manifest, manifest_path)
+
+    print(f"🏭 Rendering {len(topics)} topics with {workers} workers "
+          f"({render_threads} encoder threads each, {network_limit} network calls in flight max)")
+    started = time.perf_counter()
+    prefetch_scripts(topics, script_batch_size)
+    if upload:
+        from upload_worker import UploadWorker
+        uploader = UploadWorker(backend=upload_backend) if upload_backend else UploadWorker()
+    else:
+        uploader = nullcontext()
+    with uploader, Manager() as manager:
+        # One semaphore shared by every worker bounds provider calls across the whole batch
+        network_limiter = manager.BoundedSemaphore(network_limit)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(network_limiter, render_threads)) as executor:
+            futures = {
+                executor.submit(render_topic, topic, image_source_choice, render_backend, render_profile): topic
+                for topic in topics
+            }
+            for future in as_completed(futures):
+                topic = futures[future]
+                try:
+                    manifest[topic] = {"status": "done", **future.result()}
+                    print(f"✅ [{topic}] → {manifest[topic]['output']}")
+                except Exception as e:
+                    manifest[topic] = {"status": "failed", "error": str(e)}
+                    print(f"❌ [{topic}] failed: {e}")
+                write_manifest(manifest, manifest_path)
+                if upload and manifest[topic]["status"] == "done":
+                    try:
+                        uploader.submit(manifest[topic]["output"], topic, f"Automated video about {topic}")
+                    except RuntimeError as e:
+                        print(f"⚠️ [{topic}] not queued for upload: {e}")
+
+    elapsed = time.perf_counter() - started
+    done = sum(1 for entry in manifest.values() if entry["status"] == "done")
+    print(f"\n📊 {done}/{len(topics)} videos in {elapsed:.0f}s "
+          f"({done * 3600 / elapsed if elapsed else 0:.1f} videos/hour). Manifest: {manifest_path}")
+    return manifest
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render many topics in parallel")
+    parser.add_argument("topics", help="File with one topic per line, or - for stdin")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: CPU cores)")
+    parser.add_argument("--image-source", default="2", help="1: Freepik, 2: Pollinations")
+    parser.add_argument("--backend", help="Render backend: moviepy, static or ffmpeg")
+    parser.add_argument("--profile", help="Render profile name")
+    parser.add_argument("--network-limit", type=int, default=8, help="Max provider calls in flight across all workers")
+    parser.add_argument("--manifest", default=str(MANIFEST_FILE), help="Status manifest path")
+    parser.add_argument("--script-batch", type=int, help="Topics per Gemini request (1 = no batching)")
+    parser.add_argument("--upload", action="store_true", help="Upload each video as soon as it is rendered")
+    parser.add_argument("--upload-backend", choices=["browser", "api"], help="Upload backend (default: UPLOAD_BACKEND)")
+    args = parser.parse_args()
+
+    topics = read_topics(args.topics)
+    if not topics:
+        print("❌ No topics given")
+        sys.exit(1)
+    batch_render(
+        topics,
+        workers=args.workers,
+        image_source_choice=args.image_source,
+        render_backend=args.backend,
+        render_profile=args.profile,
+        network_limit=args.network_limit,
+        manifest_path=args.manifest,
+        upload=args.upload,
+        upload_backend=args.upload_backend,
+        script_batch_size=args.script_batch
+    )
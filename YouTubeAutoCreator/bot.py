@@ -6,7 +6,6 @@ from dotenv import load_dotenv
 from aiogram import Bot, Dispatcher, F
 from aiogram.filters import CommandStart, Command
 from aiogram.types import Message, CallbackQuery, InlineKeyboardMarkup, InlineKeyboardButton
-import subprocess
 import sys
 import atexit
 LOCK_FILE = Path("bot.lock")
@@ -24,11 +23,13 @@ def release_lock():
             LOCK_FILE.unlink()
         except Exception:
             pass
-import shutil
 from collections import defaultdict
 
-from main import VideoCreator  # Your VideoCreator module
 from youtube_batch_upload import batch_upload  # Your batch upload function
+from auth_service import auth_service
+from upload_scheduler import upload_scheduler
+from delivery import move_file, deliver_video, setup_downloads, start_download_server, DOWNLOAD_BASE_URL
+from render_jobs import render_queue, QueueLimitError, PRIORITY_HIGH, PRIORITY_NORMAL
 
 
 load_dotenv()
@@ -37,10 +38,10 @@ ADMIN_CHAT_ID = os.getenv("ADMIN_CHAT_ID")  # Keep admin for uploads
 WEBHOOK_URL = os.getenv("WEBHOOK_URL")  # Set this to your public HTTPS URL
 WEBHOOK_PATH = f"/webhook/{BOT_TOKEN}"
 WEBHOOK_FULL_URL = f"{WEBHOOK_URL}{WEBHOOK_PATH}" if WEBHOOK_URL else None
+BOT_RENDER_PROFILE = os.getenv("BOT_RENDER_PROFILE")  # e.g. draft-low-res for fast chat previews
 
 bot = Bot(token=BOT_TOKEN)
 dp = Dispatcher()
-task_lock = asyncio.Lock()
 
 
 BASE_OUTPUT_DIR = Path("output")
@@ -54,7 +55,7 @@ user_sessions = defaultdict(dict)  # user_id: {"email":..., "password":..., "sto
 
 # ---------------- USER LOGIN & STORAGE ----------------
 async def ensure_user_login_and_storage(user_id: int, email: str, password: str):
-    """Run login and storage conversion for a specific user if needed"""
+    """Make sure the user has a live saved session, logging in if needed"""
     cookie_file = USER_STORAGE_DIR / f"youtube_cookies_{user_id}.json"
     storage_file = USER_STORAGE_DIR / f"youtube_storage_{user_id}.json"
     user_sessions[user_id]["cookie_file"] = cookie_file
@@ -62,34 +63,8 @@ async def ensure_user_login_and_storage(user_id: int, email: str, password: str)
     user_sessions[user_id]["email"] = email
     user_sessions[user_id]["password"] = password
 
-    if not storage_file.exists():
-        # Use the venv Python executable
-        venv_python = str(Path(sys.executable))
-        # Step 1: run test.py for login & cookies
-        args = [venv_python, "test.py", "--email", email, "--password", password]
-        env = os.environ.copy()
-        env["COOKIE_FILE"] = str(cookie_file)
-        print(f"➡️ Running test.py for user {user_id} login with {venv_python} ...")
-        result = subprocess.run(args, capture_output=True, text=True, env=env)
-        print(result.stdout)
-        if result.returncode != 0:
-            print(result.stderr)
-            raise RuntimeError("❌ test.py failed. Please check login manually.")
-
-        # Step 2: run persistent_auth.py to convert cookies to storage
-        args2 = [venv_python, "persistent_auth.py"]
-        env2 = os.environ.copy()
-        env2["COOKIE_FILE"] = str(cookie_file)
-        env2["STORAGE_STATE_FILE"] = str(storage_file)
-        print(f"➡️ Converting cookies to storage state for user {user_id} with {venv_python} ...")
-        result2 = subprocess.run(args2, capture_output=True, text=True, env=env2)
-        print(result2.stdout)
-        if result2.returncode != 0:
-            print(result2.stderr)
-            raise RuntimeError("❌ persistent_auth.py failed. Check cookies file.")
-        print(f"✅ Login and storage state ready for user {user_id}.")
-    else:
-        print(f"✅ Storage state exists for user {user_id}. Skipping login.")
+    # Validates first (no browser); logs in inside this event loop only when needed
+    await auth_service.ensure_session(user_id, email, password, cookie_file, storage_file)
 
 
 # ---------------- BOT UTILITIES ----------------
@@ -121,7 +96,7 @@ async def start(m: Message):
         await m.answer("👋 Welcome! Please send your Google email:")
     else:
         await m.answer(
-            "👋 Hi! You are already authenticated.\n\nCommands:\n• /video <topic>\n• /upload (admin only)\n• /help"
+            "👋 Hi! You are already authenticated.\n\nCommands:\n• /video <topic>\n• /queue\n• /cancel\n• /upload (admin only)\n• /help"
         )
 
 # Handle email/password input for login
@@ -161,10 +136,13 @@ async def upload_cmd(m: Message):
         return await m.answer("🚫 Only admin can upload.")
     if user_id not in user_sessions or not user_sessions[user_id].get("storage_file"):
         return await m.answer("❗ Please authenticate first with /start.")
+    storage_file = user_sessions[user_id]["storage_file"]
+    if upload_scheduler.is_busy(storage_file):
+        await m.answer("🕒 An upload for this account is already running; yours will start right after it.")
     await m.answer("📤 Starting batch upload from your output folder ...")
-    async with task_lock:
-        # Pass user-specific storage file if needed
-        await batch_upload(storage_file=user_sessions[user_id]["storage_file"])
+    # Same account: one at a time; different accounts run in parallel up to UPLOAD_MAX_BROWSERS
+    async with upload_scheduler.slot(storage_file):
+        await batch_upload(storage_file=storage_file)
     await m.answer("✅ Upload finished.")
 
 
@@ -186,6 +164,33 @@ async def video_cmd(m: Message):
 
 
 
+@dp.message(Command("queue"))
+async def queue_cmd(m: Message):
+    jobs = render_queue.user_jobs(m.from_user.id)
+    stats = render_queue.stats()
+    uploads = upload_scheduler.metrics()
+    lines = [
+        f"🏭 {stats['running']} rendering, {stats['queued']} waiting",
+        f"📤 {uploads['running']}/{uploads['max_browsers']} uploads running "
+        f"(avg wait {uploads['account_wait_avg'] + uploads['browser_wait_avg']:.0f}s)",
+    ]
+    for job in jobs:
+        position = render_queue.position(job)
+        lines.append(f"• {job.topic}: {'rendering' if position == 0 else f'#{position} in queue'}")
+    await m.answer("\n".join(lines))
+
+
+@dp.message(Command("cancel"))
+async def cancel_cmd(m: Message):
+    jobs = render_queue.user_jobs(m.from_user.id)
+    if not jobs:
+        return await m.answer("Nothing to cancel.")
+    # Newest first: the last request is usually the one to drop
+    job = max(jobs, key=lambda j: j.id)
+    if not render_queue.cancel(job):
+        await m.answer(f"✅ Already finished: <b>{job.topic}</b>", parse_mode="HTML")
+
+
 @dp.callback_query(F.data.startswith("imgsrc:"))
 async def on_image_source(cb: CallbackQuery):
     user_id = cb.from_user.id
@@ -200,25 +205,26 @@ async def on_image_source(cb: CallbackQuery):
     )
     await cb.answer()
 
-    creator = VideoCreator()
-    loop = asyncio.get_event_loop()
+    # Renders run in the bounded process pool; admins jump the queue
+    priority = PRIORITY_HIGH if ADMIN_CHAT_ID and str(user_id) == str(ADMIN_CHAT_ID) else PRIORITY_NORMAL
+    try:
+        job = render_queue.submit(user_id, topic, src, render_profile=BOT_RENDER_PROFILE, priority=priority)
+    except QueueLimitError as e:
+        return await cb.message.answer(f"⏳ {e} Use /cancel to drop one.")
+    position = render_queue.position(job)
+    if position > 1:
+        await cb.message.answer(f"🕒 Queued as #{position}. Use /cancel to drop it.")
 
-    # Force image source choice from bot selection
     try:
-        # Pass user-specific storage file if needed
-        video_path = await loop.run_in_executor(None, creator.create_video, topic, src)
-        video_path = Path(video_path)
-        target_path = user_dir / video_path.name
-        shutil.move(str(video_path), target_path)
-        video_path = target_path
+        video_path = Path(await job.future)
+        video_path = await move_file(video_path, user_dir / video_path.name)
+    except asyncio.CancelledError:
+        return await cb.message.answer(f"🛑 Cancelled: <b>{topic}</b>", parse_mode="HTML")
     except Exception as e:
         return await cb.message.answer(f"❌ Video generation failed: {e}")
 
-    # Send video
-    if video_path.stat().st_size < 50 * 1024 * 1024:
-        await cb.message.answer_video(open(video_path, "rb"), caption=f"🎉 {video_path.name}", supports_streaming=True)
-    else:
-        await cb.message.answer(f"🎉 Video ready! Too large to send via Telegram.\nDownload: {video_path}", parse_mode="HTML")
+    # Send video (FSInputFile streams from disk; big files get a download link + preview)
+    await deliver_video(cb.message, video_path, caption=f"🎉 {video_path.name}")
 
 
 # ---------------- START BOT ----------------
@@ -235,6 +241,11 @@ async def on_shutdown(bot):
     if WEBHOOK_FULL_URL:
         await bot.delete_webhook()
         print("🛑 Webhook deleted.")
+    await auth_service.close()
+    await render_queue.close()
+
+# Polling emits dp.shutdown when it stops; in webhook mode setup_application emits it on runner cleanup
+dp.shutdown.register(on_shutdown)
 
 async def main():
     print("🤖 Bot started.")
@@ -245,6 +256,7 @@ async def main():
         app = web.Application()
         SimpleRequestHandler(dispatcher=dp, bot=bot).register(app, path=WEBHOOK_PATH)
         setup_application(app, dp, bot=bot)
+        setup_downloads(app)
         await bot.set_webhook(WEBHOOK_FULL_URL)
         print(f"✅ Webhook set: {WEBHOOK_FULL_URL}")
         runner = web.AppRunner(app)
@@ -252,10 +264,18 @@ async def main():
         site = web.TCPSite(runner, "0.0.0.0", 8080)
         print("🌐 Webhook server running on port 8080...")
         await site.start()
-        while True:
-            await asyncio.sleep(3600)
+        try:
+            while True:
+                await asyncio.sleep(3600)
+        finally:
+            await runner.cleanup()
     else:
-        await dp.start_polling(bot)
+        download_runner = await start_download_server() if DOWNLOAD_BASE_URL else None
+        try:
+            await dp.start_polling(bot)
+        finally:
+            if download_runner is not None:
+                await download_runner.cleanup()
 
 
 if __name__ == "__main__":
@@ -264,49 +284,3 @@ if __name__ == "__main__":
         asyncio.run(main())
     finally:
         release_lock()
-
-
-@dp.callback_query(F.data.startswith("imgsrc:"))
-async def on_image_source(cb: CallbackQuery):
-    _, src, topic = cb.data.split(":", 2)
-    source_name = "Pollinations" if src == "2" else "Freepik"
-    await cb.message.edit_text(
-        f"✅ Image source selected: {source_name}\n🎬 Generating video for: <b>{topic}</b>\nThis may take a few minutes...",
-        parse_mode="HTML"
-    )
-    await cb.answer()
-
-    creator = VideoCreator()
-    loop = asyncio.get_event_loop()
-    # Run the create_video function in a thread to keep bot responsive
-    # Updated: pass `src` if your create_video supports it
-    try:
-        video_path = await loop.run_in_executor(None, creator.create_video, topic, src)
-    except TypeError:
-        # fallback if create_video doesn't accept src
-        video_path = await loop.run_in_executor(None, creator.create_video, topic)
-
-    if not video_path or not Path(video_path).exists():
-        return await cb.message.answer("❌ Video generation failed.")
-
-    try:
-        await cb.message.answer_video(open(video_path, "rb"), caption=f"🎉 {Path(video_path).name}")
-    except Exception:
-        await cb.message.answer(f"🎉 Video created: <code>{video_path}</code>", parse_mode="HTML")
-
-    await cb.message.answer("📤 Uploading to YouTube...")
-    async with task_lock:
-        await batch_upload()
-    await cb.message.answer("✅ Upload complete.")
-    Path(video_path).unlink(missing_ok=True)
-
-
-# ---------------- START BOT ----------------
-async def main():
-    await ensure_login_and_storage()
-    print("🤖 Bot started.")
-    await dp.start_polling(bot)
-
-
-if __name__ == "__main__":
-    asyncio.run(main())
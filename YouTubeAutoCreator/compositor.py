@@ -0,0 +1,116 @@
+import time
+import uuid
+from pathlib import Path
+
+import numpy as np
+from moviepy.video.io.ffmpeg_writer import FFMPEG_VideoWriter
+
+
+# -----------------------------
+# Static-scene compositor
+# -----------------------------
+# A layer is a dict: {"start": s, "end": e, "frame": ndarray, "pos": (x, y)}.
+# Frames are RGB (h, w, 3) or RGBA (h, w, 4) uint8 arrays. Layers are drawn
+# in list order on a black canvas, the same way CompositeVideoClip does it.
+# An animated layer has "make_frame": f(t) (t relative to its start) instead
+# of a fixed "frame".
+
+def make_layer(frame, start, end, pos=(0, 0)):
+    return {"start": start, "end": end, "frame": frame, "pos": pos}
+
+
+def is_animated(layers):
+    return any("make_frame" in layer for layer in layers)
+
+
+def center_x(frame, canvas_size):
+    return int((canvas_size[0] - frame.shape[1]) / 2)
+
+
+def blit(canvas, frame, pos):
+    """Alpha-blend `frame` onto float `canvas` at `pos`, clipped to the canvas"""
+    x, y = pos
+    h, w = frame.shape[:2]
+    H, W = canvas.shape[:2]
+    x1, y1 = max(x, 0), max(y, 0)
+    x2, y2 = min(x + w, W), min(y + h, H)
+    if x1 >= x2 or y1 >= y2:
+        return canvas
+    src = frame[y1 - y:y2 - y, x1 - x:x2 - x]
+    if src.shape[2] == 4:
+        mask = src[:, :, 3:4] / 255.0
+        canvas[y1:y2, x1:x2] = mask * src[:, :, :3] + (1 - mask) * canvas[y1:y2, x1:x2]
+    else:
+        canvas[y1:y2, x1:x2] = src
+    return canvas
+
+
+def compose(layers, size, t=0):
+    canvas = np.zeros((size[1], size[0], 3), dtype=float)
+    for layer in layers:
+        frame = layer["make_frame"](t - layer["start"]) if "make_frame" in layer else layer["frame"]
+        blit(canvas, frame, layer["pos"])
+    return canvas.astype("uint8")
+
+
+def frame_spans(layers, duration, fps):
+    """Group output ticks into runs with the same active layers: [(active layer indices, first tick, count)]"""
+    spans = []
+    for i in range(int(duration * fps)):
+        t = i / fps
+        active = tuple(n for n, layer in enumerate(layers) if layer["start"] <= t < layer["end"])
+        if spans and spans[-1][0] == active:
+            spans[-1][2] += 1
+        else:
+            spans.append([active, i, 1])
+    return [tuple(span) for span in spans]
+
+
+def iter_span_frames(layers, size, active, first, count, fps):
+    """Frames for one span; static spans are composited once and repeated"""
+    span_layers = [layers[n] for n in active]
+    if is_animated(span_layers):
+        for i in range(first, first + count):
+            yield compose(span_layers, size, i / fps)
+    else:
+        frame = compose(span_layers, size)
+        for _ in range(count):
+            yield frame
+
+
+def iter_static_frames(layers, size, duration, fps):
+    """Yield one frame per output tick, compositing each distinct set of static layers only once"""
+    composed = {}
+    for active, first, count in frame_spans(layers, duration, fps):
+        if is_animated([layers[n] for n in active]):
+            yield from iter_span_frames(layers, size, active, first, count, fps)
+            continue
+        if active not in composed:
+            composed[active] = compose([layers[n] for n in active], size)
+        for _ in range(count):
+            yield composed[active]
+
+
+def write_static_video(layers, size, audio_clip, output_path, temp_dir, fps=24, codec="libx264",
+                       audio_codec="aac", preset="fast", threads=4, ffmpeg_params=None):
+    """Stream precomposited frames to ffmpeg and mux in `audio_clip`"""
+    temp_dir = Path(temp_dir)
+    audio_path = temp_dir / f"audio_{uuid.uuid4().hex}.m4a"
+    started = time.perf_counter()
+    try:
+        audio_clip.write_audiofile(str(audio_path), codec=audio_codec, logger=None)
+        writer = FFMPEG_VideoWriter(
+            str(output_path), size, fps, codec=codec, audiofile=str(audio_path),
+            preset=preset, threads=threads, ffmpeg_params=ffmpeg_params
+        )
+        try:
+            frames = 0
+            for frame in iter_static_frames(layers, size, audio_clip.duration, fps):
+                writer.write_frame(frame)
+                frames += 1
+        finally:
+            writer.close()
+    finally:
+        audio_path.unlink(missing_ok=True)
+    print(f"✅ Static compositor wrote {frames} frames in {time.perf_counter() - started:.1f}s")
+    return output_path
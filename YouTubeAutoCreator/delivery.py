@@ -0,0 +1,158 @@
+import os
+import hmac
+import time
+import shutil
+import asyncio
+import hashlib
+from pathlib import Path
+from typing import Optional
+from urllib.parse import quote
+
+from aiohttp import web
+from aiogram.types import FSInputFile, Message
+
+from ffmpeg_render import FFMPEG_BINARY
+
+# -----------------------------
+# Config
+# -----------------------------
+TELEGRAM_VIDEO_LIMIT = 50 * 1024 * 1024  # Bot API upload cap
+DOWNLOAD_ROOT = Path(os.getenv("DOWNLOAD_ROOT", "output")).absolute()
+DOWNLOAD_BASE_URL = os.getenv("DOWNLOAD_BASE_URL") or os.getenv("WEBHOOK_URL")  # public URL of the bot's web server
+DOWNLOAD_PORT = int(os.getenv("DOWNLOAD_PORT", "8080"))
+DOWNLOAD_TTL = int(os.getenv("DOWNLOAD_TTL", str(24 * 3600)))  # seconds a download link stays valid
+DOWNLOAD_SECRET = (os.getenv("DOWNLOAD_SECRET") or os.getenv("TELEGRAM_BOT_TOKEN") or "").encode()
+TELEGRAM_PREVIEW = os.getenv("TELEGRAM_PREVIEW", "1") == "1"  # send a compressed preview for oversized videos
+PREVIEW_HEIGHT = 480
+
+
+# -----------------------------
+# Off-loop file moves
+# -----------------------------
+async def move_file(src, dst) -> Path:
+    """shutil.move on a worker thread (cross-device moves copy the whole file)"""
+    dst = Path(dst)
+    await asyncio.to_thread(dst.parent.mkdir, parents=True, exist_ok=True)
+    await asyncio.to_thread(shutil.move, str(src), str(dst))
+    return dst
+
+
+# -----------------------------
+# Signed download links
+# -----------------------------
+def _signature(rel_path: str, expires: int) -> str:
+    return hmac.new(DOWNLOAD_SECRET, f"{rel_path}|{expires}".encode(), hashlib.sha256).hexdigest()[:32]
+
+
+def download_url(video_path) -> Optional[str]:
+    """Expiring link to `video_path` (must live under DOWNLOAD_ROOT), or None if no public URL is configured"""
+    if not DOWNLOAD_BASE_URL or not DOWNLOAD_SECRET:
+        return None
+    rel_path = Path(video_path).absolute().relative_to(DOWNLOAD_ROOT).as_posix()
+    expires = int(time.time()) + DOWNLOAD_TTL
+    return (f"{DOWNLOAD_BASE_URL.rstrip('/')}/files/{quote(rel_path)}"
+            f"?expires={expires}&sig={_signature(rel_path, expires)}")
+
+
+async def handle_download(request: web.Request):
+    """Serve a finished video; aiohttp's FileResponse handles Range requests and uses sendfile"""
+    rel_path = request.match_info["path"]
+    try:
+        expires = int(request.query.get("expires", "0"))
+    except ValueError:
+        raise web.HTTPForbidden()
+    if expires < time.time() or not hmac.compare_digest(request.query.get("sig", ""), _signature(rel_path, expires)):
+        raise web.HTTPForbidden()
+    path = (DOWNLOAD_ROOT / rel_path).resolve()
+    if DOWNLOAD_ROOT.resolve() not in path.parents or not path.is_file():
+        raise web.HTTPNotFound()
+    return web.FileResponse(path, headers={"Content-Disposition": f'attachment; filename="{path.name}"'})
+
+
+def setup_downloads(app: web.Application):
+    """Add the download route to an existing aiohttp app (the webhook server)"""
+    app.router.add_get("/files/{path:.+}", handle_download)
+
+
+async def start_download_server(port: int = DOWNLOAD_PORT) -> web.AppRunner:
+    """Standalone download server for polling mode, where there is no webhook app to attach to"""
+    app = web.Application()
+    setup_downloads(app)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "0.0.0.0", port).start()
+    print(f"🌐 Download server running on port {port}...")
+    return runner
+
+
+# -----------------------------
+# Telegram preview
+# -----------------------------
+def _duration(video_path) -> float:
+    from moviepy.video.io.ffmpeg_reader import ffmpeg_parse_infos
+    return ffmpeg_parse_infos(str(video_path)).get("duration") or 0.0
+
+
+async def make_preview(video_path, max_bytes: int = TELEGRAM_VIDEO_LIMIT) -> Optional[Path]:
+    """Fast low-res transcode sized to fit Telegram's limit; None if it can't be made small enough"""
+    video_path = Path(video_path)
+    duration = await asyncio.to_thread(_duration, video_path)
+    if duration <= 0:
+        return None
+    # 90% of the byte budget, minus 64 kbit/s audio
+    video_kbps = int(max_bytes * 8 * 0.9 / duration / 1000) - 64
+    if video_kbps < 150:
+        return None
+    preview_path = video_path.with_name(f"{video_path.stem}_preview.mp4")
+    process = await asyncio.create_subprocess_exec(
+        FFMPEG_BINARY, "-y", "-hide_banner", "-loglevel", "error", "-i", str(video_path),
+        "-vf", f"scale=-2:'min({PREVIEW_HEIGHT},ih)'", "-c:v", "libx264", "-preset", "veryfast",
+        "-b:v", f"{video_kbps}k", "-maxrate", f"{video_kbps}k", "-bufsize", f"{video_kbps * 2}k",
+        "-c:a", "aac", "-b:a", "64k", "-movflags", "+faststart", str(preview_path),
+        stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.PIPE
+    )
+    _, stderr = await process.communicate()
+    if process.returncode != 0:
+        print(f"⚠️ Preview transcode failed: {stderr.decode(errors='replace').strip()}")
+        preview_path.unlink(missing_ok=True)
+        return None
+    if preview_path.stat().st_size > max_bytes:
+        preview_path.unlink(missing_ok=True)
+        return None
+    return preview_path
+
+
+# -----------------------------
+# Delivery
+# -----------------------------
+async def deliver_video(message: Message, video_path, caption: str):
+    """Send a finished video without blocking the event loop.
+
+    Small files are streamed from disk with FSInputFile. Larger ones get an
+    expiring range-capable download link and, if enabled, a compressed
+    preview that fits Telegram's limit.
+    """
+    video_path = Path(video_path)
+    size = (await asyncio.to_thread(video_path.stat)).st_size
+    if size < TELEGRAM_VIDEO_LIMIT:
+        await message.answer_video(FSInputFile(video_path), caption=caption, supports_streaming=True)
+        return
+
+    try:
+        url = download_url(video_path)
+    except ValueError:
+        # Outside DOWNLOAD_ROOT, so it can't be served; the path and preview still go out
+        print(f"⚠️ {video_path} is outside {DOWNLOAD_ROOT}, no download link")
+        url = None
+    if url:
+        await message.answer(f"🎉 Video ready ({size / 1e6:.0f} MB), too large for Telegram.\n⬇️ Download: {url}")
+    else:
+        await message.answer(f"🎉 Video ready! Too large to send via Telegram.\nSaved at: {video_path}")
+
+    if TELEGRAM_PREVIEW:
+        preview = await make_preview(video_path)
+        if preview is not None:
+            try:
+                await message.answer_video(FSInputFile(preview), caption=f"👀 Preview: {caption}", supports_streaming=True)
+            finally:
+                preview.unlink(missing_ok=True)
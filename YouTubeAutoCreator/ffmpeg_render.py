@@ -0,0 +1,88 @@
+import os
+import time
+import shutil
+import tempfile
+import subprocess
+from pathlib import Path
+
+import imageio_ffmpeg
+from PIL import Image
+from moviepy.video.io.ffmpeg_writer import FFMPEG_VideoWriter
+
+from compositor import compose, frame_spans, is_animated, iter_span_frames
+
+FFMPEG_BINARY = os.getenv("FFMPEG_BINARY") or imageio_ffmpeg.get_ffmpeg_exe()
+
+
+# -----------------------------
+# Still-segment ffmpeg backend
+# -----------------------------
+def run_ffmpeg(args):
+    cmd = [FFMPEG_BINARY, "-y", "-hide_banner", "-loglevel", "error"] + [str(a) for a in args]
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed: {result.stderr.strip()}")
+
+
+def thread_args(threads):
+    # Without -threads, x264 uses every core, which breaks batch_render's RENDER_THREADS core split
+    return ["-threads", threads] if threads else []
+
+
+def encode_still_segment(frame, count, fps, segment_path, work_dir, codec, preset, threads, ffmpeg_params):
+    """Encode `count` ticks of a single frame: ffmpeg loops the still, no frames go through Python"""
+    still_path = Path(work_dir) / f"{Path(segment_path).stem}.png"
+    Image.fromarray(frame).save(still_path)
+    tune = [] if "-tune" in ffmpeg_params else ["-tune", "stillimage"]
+    run_ffmpeg(
+        ["-loop", "1", "-framerate", fps, "-i", still_path,
+         "-frames:v", count, "-c:v", codec, "-preset", preset] + thread_args(threads) + tune +
+        ["-pix_fmt", "yuv420p", "-r", fps] + list(ffmpeg_params) + [segment_path]
+    )
+
+
+def encode_animated_segment(layers, size, active, first, count, fps, segment_path, codec, preset, threads, ffmpeg_params):
+    """Fallback for spans with animated layers: pipe each frame to ffmpeg"""
+    writer = FFMPEG_VideoWriter(
+        str(segment_path), size, fps, codec=codec, preset=preset, threads=threads, ffmpeg_params=ffmpeg_params
+    )
+    try:
+        for frame in iter_span_frames(layers, size, active, first, count, fps):
+            writer.write_frame(frame)
+    finally:
+        writer.close()
+
+
+def write_segmented_video(layers, size, audio_clip, output_path, temp_dir, fps=24, codec="libx264",
+                          audio_codec="aac", preset="fast", threads=4, ffmpeg_params=None):
+    """Encode each static span once as a looped-still segment, join with the concat demuxer, mux audio"""
+    ffmpeg_params = list(ffmpeg_params or [])
+    work_dir = Path(tempfile.mkdtemp(prefix="segments_", dir=temp_dir))
+    started = time.perf_counter()
+    try:
+        audio_path = work_dir / "audio.m4a"
+        audio_clip.write_audiofile(str(audio_path), codec=audio_codec, logger=None)
+
+        segments = []
+        for n, (active, first, count) in enumerate(frame_spans(layers, audio_clip.duration, fps)):
+            segment_path = work_dir / f"seg_{n:04d}.mp4"
+            if is_animated([layers[i] for i in active]):
+                encode_animated_segment(layers, size, active, first, count, fps, segment_path,
+                                        codec, preset, threads, ffmpeg_params)
+            else:
+                frame = compose([layers[i] for i in active], size)
+                encode_still_segment(frame, count, fps, segment_path, work_dir, codec, preset, threads, ffmpeg_params)
+            segments.append(segment_path)
+
+        concat_list = work_dir / "segments.txt"
+        concat_list.write_text("".join(f"file '{p.name}'\n" for p in segments), encoding="utf-8")
+        run_ffmpeg(
+            ["-f", "concat", "-safe", "0", "-i", concat_list, "-i", audio_path,
+             "-map", "0:v", "-map", "1:a", "-c:v", "copy", "-c:a", "copy"] + thread_args(threads) +
+            ["-movflags", "+faststart", output_path]
+        )
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print(f"✅ ffmpeg backend wrote {len(segments)} segments in {time.perf_counter() - started:.1f}s")
+    return output_path
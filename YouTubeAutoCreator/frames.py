@@ -0,0 +1,46 @@
+import os
+from io import BytesIO
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+from PIL import Image, ImageOps
+
+from media_cache import MediaCache, get_image_cache
+
+
+# -----------------------------
+# Pre-scaled still frames
+# -----------------------------
+def prescale_image(img_path, size):
+    """Scale and centre-crop an image to `size` once, cached next to the source images.
+
+    Returns the path of the scaled PNG. The cache key includes the source
+    file's size and mtime so a replaced source is scaled again.
+    """
+    img_path = Path(img_path)
+    stat = img_path.stat()
+    cache = get_image_cache()
+    key = MediaCache.make_key("prescaled", img_path.resolve(), stat.st_size, stat.st_mtime_ns, size[0], size[1])
+    cached = cache.get(key)
+    if cached:
+        return cached
+
+    with Image.open(img_path) as img:
+        scaled = ImageOps.fit(img.convert("RGB"), size, method=Image.LANCZOS)
+    buf = BytesIO()
+    scaled.save(buf, format="PNG")
+    return cache.put_bytes(key, buf.getvalue(), ext=".png")
+
+
+@lru_cache(maxsize=int(os.getenv("FRAME_MEMORY_CACHE", "32")))
+def _load_frame(img_path, size, mtime_ns):
+    with Image.open(prescale_image(img_path, size)) as img:
+        frame = np.asarray(img.convert("RGB"))
+    return frame
+
+
+def load_frame(img_path, size):
+    """Ready-to-use RGB frame array for `img_path` at exactly `size` (width, height)"""
+    img_path = str(img_path)
+    return _load_frame(img_path, tuple(size), os.stat(img_path).st_mtime_ns)
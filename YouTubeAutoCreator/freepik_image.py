@@ -1,60 +1,56 @@
 import os
 import re
-import requests
+import shutil
+import asyncio
 from playwright.sync_api import sync_playwright, TimeoutError
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import http_client
+from main import afetch_pollinations
 
 
-def pollinations_generate_image(prompt, output_path):
-    """Generate image using Pollinations API with caching & safe filenames."""
+async def apollinations_generate_image(prompt, output_path, size=None):
+    """Generate image using Pollinations API with the shared image cache & safe filenames."""
     max_len = 120
     base, ext = os.path.splitext(output_path)
     safe_base = re.sub(r'[^a-zA-Z0-9_]', '_', base)
     safe_base = safe_base[:max_len]
     output_path = safe_base + ext
 
-    if os.path.exists(output_path):
-        print(f"⚡ Cached Pollinations image found: {output_path}")
-        return True
-
     outdir = os.path.dirname(os.path.abspath(output_path))
     os.makedirs(outdir, exist_ok=True)
 
-    url = f"https://image.pollinations.ai/prompt/{prompt}"
-    try:
-        response = requests.get(url)
-        if response.status_code == 200:
-            with open(output_path, "wb") as f:
-                f.write(response.content)
-            print(f"✅ Pollinations image saved to {output_path}")
-            return True
-        else:
-            print(f"❌ Pollinations API error: {response.status_code}")
-            return False
-    except Exception as e:
-        print(f"❌ Pollinations image generation error: {e}")
+    # main's fetch: same cache entries, image verification and network limits
+    cached = await afetch_pollinations(prompt, size)
+    if cached is None:
+        print("❌ Pollinations image generation failed")
         return False
+    shutil.copyfile(cached, output_path)
+    print(f"✅ Pollinations image saved to {output_path}")
+    return True
 
 
-def generate_images_pollinations(prompts_outputs):
-    """Batch generate multiple Pollinations images concurrently."""
-    with ThreadPoolExecutor(max_workers=4) as executor:
-        futures = {
-            executor.submit(pollinations_generate_image, prompt, output_path): (prompt, output_path)
-            for prompt, output_path in prompts_outputs
-        }
-        for future in as_completed(futures):
-            prompt, output_path = futures[future]
-            try:
-                future.result()
-            except Exception as e:
-                print(f"❌ Error generating {prompt}: {e}")
+def pollinations_generate_image(prompt, output_path, size=None):
+    return http_client.run(apollinations_generate_image(prompt, output_path, size))
+
+
+async def _generate_all(prompts_outputs, size=None):
+    return await asyncio.gather(
+        *(apollinations_generate_image(prompt, output_path, size) for prompt, output_path in prompts_outputs),
+        return_exceptions=True
+    )
+
+
+def generate_images_pollinations(prompts_outputs, size=None):
+    """Batch generate multiple Pollinations images concurrently (per-host limits come from http_client)."""
+    results = http_client.run(_generate_all(prompts_outputs, size))
+    for (prompt, _), result in zip(prompts_outputs, results):
+        if isinstance(result, Exception):
+            print(f"❌ Error generating {prompt}: {result}")
 
 
-def generate_image(prompt, output_path, image_source_choice):
+def generate_image(prompt, output_path, image_source_choice, size=None):
     """Unified image generator for Pollinations (2) or Freepik (1)."""
     if image_source_choice == "2":
-        return pollinations_generate_image(prompt, output_path)
+        return pollinations_generate_image(prompt, output_path, size)
 
     # Default: Freepik AI (requires manual login)
     user_data_dir = "freepik_profile"
@@ -0,0 +1,152 @@
+import os
+import random
+import asyncio
+import threading
+from urllib.parse import urlsplit
+
+import httpx
+
+try:
+    import h2  # noqa: F401  (httpx only speaks HTTP/2 when the h2 package is installed)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# -----------------------------
+# Config
+# -----------------------------
+HTTP2 = HTTP2_AVAILABLE and os.getenv("HTTP2", "1") == "1"
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_PER_HOST_LIMIT = int(os.getenv("HTTP_PER_HOST_LIMIT", "8"))  # requests in flight per host
+HTTP_HOST_LIMITS = {  # per-host overrides, e.g. "image.pollinations.ai=16,generativelanguage.googleapis.com=4"
+    host.strip(): int(limit)
+    for host, _, limit in (item.partition("=") for item in os.getenv("HTTP_HOST_LIMITS", "").split(",") if "=" in item)
+}
+HTTP_TIMEOUT = httpx.Timeout(float(os.getenv("HTTP_TIMEOUT", "60")), connect=10.0)
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class HttpError(Exception):
+    pass
+
+
+# -----------------------------
+# Shared async client
+# -----------------------------
+class AsyncHttp:
+    """One pooled httpx.AsyncClient for every provider, with per-host limits and retries.
+
+    Connections (HTTP/2 when h2 is installed) are reused across providers
+    and calls; each host gets its own concurrency cap so one slow provider
+    can't take every connection. Must be used from the loop it was created on.
+    """
+
+    def __init__(self, per_host_limit=HTTP_PER_HOST_LIMIT, host_limits=None):
+        self.client = httpx.AsyncClient(
+            http2=HTTP2,
+            timeout=HTTP_TIMEOUT,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=HTTP_MAX_CONNECTIONS, max_keepalive_connections=20),
+        )
+        self.per_host_limit = per_host_limit
+        self.host_limits = dict(HTTP_HOST_LIMITS if host_limits is None else host_limits)
+        self._host_slots = {}
+
+    def _slot(self, url):
+        host = urlsplit(str(url)).hostname or ""
+        if host not in self._host_slots:
+            self._host_slots[host] = asyncio.Semaphore(self.host_limits.get(host, self.per_host_limit))
+        return self._host_slots[host]
+
+    async def request(self, method, url, *, retries=3, backoff=1.0, retry_statuses=RETRY_STATUSES, **kwargs):
+        """Send a request, retrying transport errors and `retry_statuses` with jittered backoff.
+
+        Returns the last response for any other status (call raise_for_status
+        yourself); raises HttpError once every attempt has failed.
+        """
+        error = None
+        for attempt in range(retries + 1):
+            retry_after = None
+            try:
+                async with self._slot(url):
+                    response = await self.client.request(method, url, **kwargs)
+                if response.status_code not in retry_statuses:
+                    return response
+                error = f"HTTP {response.status_code}"
+                retry_after = response.headers.get("Retry-After")
+            except httpx.TransportError as e:
+                error = f"{type(e).__name__}: {e}"
+
+            if attempt < retries:
+                # Full jitter: calls that failed together don't all retry together
+                wait = random.uniform(0, backoff * 2 ** attempt)
+                if retry_after and retry_after.isdigit():
+                    wait = max(wait, int(retry_after))
+                print(f"⚠️ {method} {urlsplit(str(url)).hostname} failed ({error}), retrying in {wait:.1f}s "
+                      f"({attempt + 1}/{retries})")
+                await asyncio.sleep(wait)
+        raise HttpError(f"{method} {url} failed after {retries + 1} attempts: {error}")
+
+    async def get(self, url, **kwargs):
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url, **kwargs):
+        return await self.request("POST", url, **kwargs)
+
+    async def aclose(self):
+        await self.client.aclose()
+
+
+# -----------------------------
+# Process-wide I/O loop
+# -----------------------------
+_loop = None
+_http = None
+_loop_lock = threading.Lock()
+
+
+def _io_loop():
+    """Background event loop owning the shared client; sync code submits coroutines to it"""
+    global _loop, _http
+    with _loop_lock:
+        if _loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="http-io", daemon=True).start()
+            _http = asyncio.run_coroutine_threadsafe(_make_http(), loop).result()
+            _loop = loop
+        return _loop
+
+
+async def _make_http():
+    return AsyncHttp()
+
+
+def _reset_after_fork():
+    # A forked render worker inherits the globals but not the loop's thread
+    global _loop, _http, _loop_lock
+    _loop, _http, _loop_lock = None, None, threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def get_http() -> AsyncHttp:
+    """The shared client; only await its methods via run()/submit() (it lives on the I/O loop)"""
+    _io_loop()
+    return _http
+
+
+def submit(coro):
+    """Schedule `coro` on the I/O loop, returns a concurrent.futures.Future"""
+    return asyncio.run_coroutine_threadsafe(coro, _io_loop())
+
+
+def run(coro):
+    """Run `coro` on the I/O loop and block the calling thread for its result"""
+    return submit(coro).result()
+
+
+async def arun(coro):
+    """Await `coro` on the I/O loop from another event loop (e.g. the bot's)"""
+    return await asyncio.wrap_future(submit(coro))
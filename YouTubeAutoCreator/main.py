@@ -2,19 +2,34 @@ import os
 import re
 import time
 import json
-import requests
+import uuid
+import shutil
+import threading
 import asyncio
+from contextlib import contextmanager, asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor, Future, as_completed
+from io import BytesIO
 from pathlib import Path
 from dotenv import load_dotenv
 from gtts import gTTS
+import numpy as np
 from PIL import Image, ImageFile
 from moviepy.editor import (
     AudioFileClip,
     CompositeVideoClip,
-    TextClip,
     ImageClip,
     ColorClip
 )
+from pipeline import StageGraph
+from frames import load_frame
+from subtitles import render_subtitles, style_for_canvas, subtitle_y
+from compositor import make_layer, center_x, write_static_video
+from ffmpeg_render import write_segmented_video
+from render_profiles import DEFAULT_RENDER_PROFILE, get_render_profile, tune_for_duration, encoder_settings
+from script_client import get_script_client
+import http_client
+from http_client import get_http
+from media_cache import get_image_cache, get_tts_cache, get_render_cache, image_cache_key, tts_cache_key, render_cache_key
 
 # Enable PIL to load truncated images
 ImageFile.LOAD_TRUNCATED_IMAGES = True
@@ -25,56 +40,125 @@ load_dotenv()
 # -----------------------------
 # YouTube Uploader (async)
 # -----------------------------
-from youtube_uploader import upload_video
-from youtube_batch_upload import batch_upload
+from upload_worker import UploadWorker
+
+# -----------------------------
+# Network concurrency limit
+# -----------------------------
+_network_limiter = None
+
+def set_network_limiter(limiter):
+    """Bound provider calls with a (possibly cross-process) semaphore, e.g. from batch_render"""
+    global _network_limiter
+    _network_limiter = limiter
+
+@contextmanager
+def network_slot():
+    if _network_limiter is None:
+        yield
+        return
+    with _network_limiter:
+        yield
+
+@asynccontextmanager
+async def anetwork_slot():
+    """network_slot for coroutines: the (blocking) limiter is acquired off the event loop"""
+    if _network_limiter is None:
+        yield
+        return
+    await asyncio.to_thread(_network_limiter.acquire)
+    try:
+        yield
+    finally:
+        _network_limiter.release()
 
 # -----------------------------
 # Image Generation
 # -----------------------------
-def pollinations_generate_image(prompt, output_path, retries=3, delay=5):
+POLLINATIONS_URL = os.getenv("POLLINATIONS_URL", "https://image.pollinations.ai/prompt/")
+IMAGE_PREFETCH_WORKERS = int(os.getenv("IMAGE_PREFETCH_WORKERS", "6"))
+
+PLACEHOLDER_IMAGE = "assets/placeholder_bg.jpeg"
+
+async def afetch_pollinations(prompt, size=None, retries=3, delay=5):
+    """Cached path of a verified Pollinations image, or None. Shared by every Pollinations caller.
+
+    Runs on the shared HTTP layer under network_slot; only bodies that decode
+    as images are stored in the shared cache.
+    """
+    cache = get_image_cache()
+    key = image_cache_key("pollinations", prompt, size)
+    cached = cache.get(key)
+    if cached:
+        print(f"⚡ Using cached image: {cached}")
+        return str(cached)
+
+    params = {"width": size[0], "height": size[1]} if size else None
     for attempt in range(retries):
         try:
-            output_path = Path(output_path)
-            output_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            base, ext = os.path.splitext(output_path.name)
-            safe_base = re.sub(r'[^a-zA-Z0-9_]', '_', base)[:120]
-            output_path = output_path.parent / f"{safe_base}{ext}"
-
-            if output_path.exists():
-                print(f"⚡ Using cached image: {output_path}")
-                return str(output_path)
-
-            url = f"https://image.pollinations.ai/prompt/{prompt}"
-            response = requests.get(url, timeout=60)  # increase timeout
+            # Status and transport errors are retried inside the HTTP layer; this loop also
+            # covers a 200 whose body is truncated or not an image
+            async with anetwork_slot():
+                response = await get_http().get(f"{POLLINATIONS_URL}{prompt}", params=params, retries=retries - 1, backoff=delay)
             response.raise_for_status()
-            
-            with open(output_path, "wb") as f:
-                f.write(response.content)
-            
-            img = Image.open(output_path)
+
+            img = Image.open(BytesIO(response.content))
             img.verify()
+            output_path = cache.put_bytes(key, response.content, ext=".jpeg")
             print(f"✅ Generated image: {output_path}")
             return str(output_path)
-
+        except http_client.HttpError as e:
+            print(f"❌ Pollinations failed: {e}")  # the HTTP layer already used up its retries
+            return None
         except Exception as e:
             print(f"❌ Pollinations attempt {attempt+1} failed: {e}")
             if attempt < retries - 1:
-                time.sleep(delay)
-            else:
-                print("⚠️ Using placeholder image instead")
-                return str(Path("assets/placeholder_bg.jpeg"))
-
-def generate_image(prompt, output_path, image_source_choice):
-    output_path = Path(output_path)
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    
+                await asyncio.sleep(delay)
+    return None
+
+async def apollinations_generate_image(prompt, size=None, retries=3, delay=5):
+    """Async Pollinations image for a scene, falling back to the placeholder; no thread per call"""
+    path = await afetch_pollinations(prompt, size, retries, delay)
+    if path is None:
+        print("⚠️ Using placeholder image instead")
+        return str(Path(PLACEHOLDER_IMAGE))
+    return path
+
+def pollinations_generate_image(prompt, size=None, retries=3, delay=5):
+    return http_client.run(apollinations_generate_image(prompt, size, retries, delay))
+
+async def afetch_images(prompts, size=None):
+    """{prompt: image path} for every prompt, all requests in flight together"""
+    paths = await asyncio.gather(*(apollinations_generate_image(prompt, size) for prompt in prompts))
+    return dict(zip(prompts, paths))
+
+def generate_image(prompt, image_source_choice, size=None):
     if image_source_choice == "2":
-        return pollinations_generate_image(prompt, output_path)
+        return pollinations_generate_image(prompt, size=size)
     else:
         # Freepik AI placeholder (not implemented)
         return None
 
+# -----------------------------
+# Voiceover
+# -----------------------------
+TTS_WORKERS = int(os.getenv("TTS_WORKERS", "4"))
+TTS_PER_SCENE = os.getenv("TTS_PER_SCENE", "0") == "1"
+
+def synthesize_speech(text, lang='en', slow=False):
+    """gTTS synthesis through the shared TTS cache, returns the cached mp3 path"""
+    cache = get_tts_cache()
+    key = tts_cache_key(text, lang, slow)
+    cached = cache.get(key)
+    if cached:
+        print(f"⚡ Using cached voiceover: {cached}")
+        return cached
+
+    buf = BytesIO()
+    with network_slot():
+        gTTS(text=text, lang=lang, slow=slow).write_to_fp(buf)
+    return cache.put_bytes(key, buf.getvalue(), ext=".mp3")
+
 # -----------------------------
 # Helper functions
 # -----------------------------
@@ -86,6 +170,13 @@ def clean_script_text(script):
     script = re.sub(r'\s+', ' ', script).strip()
     return script
 
+def scene_prompt(visual_desc):
+    """Turn a scene's visual direction into an image prompt"""
+    prompt = re.sub(r'^[Vv]isuals?:\s*', '', visual_desc.strip())[:200].strip()
+    if not prompt or any(k in prompt.lower() for k in ['music', 'audio', 'sound']):
+        prompt = "technology abstract background"
+    return prompt
+
 def parse_script(script):
     """Parse script with timestamps into scenes"""
     scenes = []
@@ -109,41 +200,10 @@ def parse_script(script):
     return scenes
 
 # -----------------------------
-# Video Creator Class
+# Script prompt
 # -----------------------------
-class VideoCreator:
-    def __init__(self):
-        self.temp_dir = Path("temp")
-        self.output_dir = Path("output")
-        self.assets_dir = Path("assets")
-        self.gemini_api_key = os.getenv("GEMINI_API_KEY")
-        
-        self.temp_dir.mkdir(parents=True, exist_ok=True)
-        self.output_dir.mkdir(parents=True, exist_ok=True)
-        self.assets_dir.mkdir(parents=True, exist_ok=True)
-
-        placeholder = self.assets_dir / "placeholder_bg.jpeg"
-        if not placeholder.exists():
-            self.create_placeholder_image(placeholder)
-
-    def create_placeholder_image(self, path):
-        img = Image.new('RGB', (1280, 720), color=(40, 40, 40))
-        img.save(path)
-        print(f"✅ Created placeholder image at {path}")
-
-    def safe_filename(self, text, ext=".jpeg"):
-        safe = re.sub(r'[^a-zA-Z0-9_]', '_', text)[:150]
-        return self.temp_dir / f"{safe}{ext}"
-
-    def generate_script(self, topic):
-        print(f"📝 Requesting script for topic: {topic}")
-        try:
-            url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash:generateContent?key={self.gemini_api_key}"
-            headers = {'Content-Type': 'application/json'}
-            payload = {
-                "contents": [{
-                    "parts": [{
-                        "text": f"""Create a highly engaging 60-second YouTube Shorts script about: {topic}
+def script_prompt(topic):
+    return f"""Create a highly engaging 60-second YouTube Shorts script about: {topic}
 
 CRITICAL REQUIREMENTS:
 - HOOK FIRST: Start with an irresistible 3-second hook that stops the scroll
@@ -171,84 +231,227 @@ EXAMPLE FORMAT:
 [Text overlay: "WRONG YOUR WHOLE LIFE?"]
 
 Generate the most viral-worthy version possible that maximizes shareability and completion rates."""
-                    }]
-                }]
-            }
-            response = requests.post(url, headers=headers, data=json.dumps(payload), timeout=30)
-            response.raise_for_status()
-            data = response.json()
-            script = data["candidates"][0]["content"]["parts"][0]["text"]
+
+SCRIPT_BATCH_SIZE = int(os.getenv("SCRIPT_BATCH_SIZE", "5"))  # topics per Gemini request in batch mode
+BATCH_GENERATION_CONFIG = {"responseMimeType": "application/json"}
+
+def batch_script_prompt(topics):
+    """One request for several topics; the model answers with a JSON array of {topic, script}"""
+    listing = "\n".join(f"{i}. {topic}" for i, topic in enumerate(topics, 1))
+    return f"""{script_prompt("each of the topics listed below")}
+
+TOPICS:
+{listing}
+
+Return ONLY a JSON array with exactly {len(topics)} objects, in the same order as the topics, each shaped like
+{{"topic": "<the topic>", "script": "<the full timestamped script as plain text>"}}"""
+
+def split_batch_scripts(raw, topics):
+    """{topic: script} for every entry of a batched response that parses into scenes"""
+    raw = raw.strip()
+    if raw.startswith("```"):
+        raw = raw.split("\n", 1)[-1].rsplit("```", 1)[0]
+    try:
+        items = json.loads(raw)
+    except ValueError:
+        return {}
+    if not isinstance(items, list):
+        return {}
+    by_topic = {str(item.get("topic", "")).strip().lower(): item for item in items if isinstance(item, dict)}
+    scripts = {}
+    for i, topic in enumerate(topics):
+        item = by_topic.get(topic.strip().lower())
+        if item is None and i < len(items) and isinstance(items[i], dict):
+            item = items[i]  # topic echoed back differently: fall back to position
+        script = item.get("script") if item else None
+        if isinstance(script, str) and parse_script(script):
+            scripts[topic] = script
+    return scripts
+
+# -----------------------------
+# Video Creator Class
+# -----------------------------
+VIDEO_SIZE = (1280, 720)
+RENDER_BACKEND = os.getenv("RENDER_BACKEND", "moviepy")  # "moviepy", "static" or "ffmpeg"
+
+# Finished-video cache; bump PIPELINE_VERSION whenever a change alters what a render looks like
+PIPELINE_VERSION = "1"
+RENDER_CACHE = os.getenv("RENDER_CACHE", "1") == "1"
+RENDER_CACHE_TTL = int(os.getenv("RENDER_CACHE_TTL", str(7 * 24 * 3600)))  # seconds
+
+# key -> Future of the cached mp4 path, so identical concurrent requests share one render
+_inflight_renders = {}
+_inflight_lock = threading.Lock()
+
+class VideoCreator:
+    def __init__(self, per_scene_tts=TTS_PER_SCENE, render_backend=RENDER_BACKEND, render_profile=DEFAULT_RENDER_PROFILE):
+        self.per_scene_tts = per_scene_tts
+        self.render_backend = render_backend
+        self.render_profile = render_profile
+        self.temp_dir = Path("temp")
+        self.output_dir = Path("output")
+        self.assets_dir = Path("assets")
+        self.gemini_api_key = os.getenv("GEMINI_API_KEY")
+        
+        self.temp_dir.mkdir(parents=True, exist_ok=True)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.assets_dir.mkdir(parents=True, exist_ok=True)
+
+        placeholder = self.assets_dir / "placeholder_bg.jpeg"
+        if not placeholder.exists():
+            self.create_placeholder_image(placeholder)
+
+    def create_placeholder_image(self, path):
+        img = Image.new('RGB', (1280, 720), color=(40, 40, 40))
+        img.save(path)
+        print(f"✅ Created placeholder image at {path}")
+
+    def generate_script(self, topic):
+        print(f"📝 Requesting script for topic: {topic}")
+        try:
+            script = get_script_client(self.gemini_api_key, slot=network_slot).generate(script_prompt(topic))
             print("✅ Script received")
             return script
         except Exception as e:
             print(f"❌ Gemini API Error: {e}")
             return None
 
-    def create_voiceover(self, text, filename="voiceover.mp3"):
-        voice_path = self.temp_dir / filename
+    def generate_scripts(self, topics, batch_size=SCRIPT_BATCH_SIZE):
+        """Scripts for many topics in ceil(n / batch_size) requests; returns {topic: script}.
+
+        Each script is stored in the script cache under its single-topic
+        prompt, so a later generate_script(topic) (e.g. inside a render
+        worker) is a cache hit. Entries missing or malformed in a batched
+        response fall back to one request per topic.
+        """
+        client = get_script_client(self.gemini_api_key, slot=network_slot)
+        unique = list(dict.fromkeys(topics))
+        scripts, missing = {}, []
+        for topic in unique:
+            cached = client.lookup(script_prompt(topic))
+            if cached is not None:
+                scripts[topic] = cached
+            else:
+                missing.append(topic)
+
+        requests_made = 0
+        for i in range(0, len(missing) if batch_size > 1 else 0, batch_size):
+            chunk = missing[i:i + batch_size]
+            if len(chunk) < 2:
+                continue
+            print(f"📝 Requesting {len(chunk)} scripts in one batch")
+            requests_made += 1
+            try:
+                raw = client.generate(batch_script_prompt(chunk), generation_config=BATCH_GENERATION_CONFIG,
+                                      use_cache=False)
+            except Exception as e:
+                print(f"⚠️ Batched script request failed: {e}")
+                continue
+            for topic, script in split_batch_scripts(raw, chunk).items():
+                client.store(script_prompt(topic), script)
+                scripts[topic] = script
+
+        fallbacks = [topic for topic in missing if topic not in scripts]
+        if fallbacks and batch_size > 1:
+            print(f"↩️ {len(fallbacks)} scripts missing from batched responses, requesting them one by one")
+        for topic in fallbacks:
+            requests_made += 1
+            script = self.generate_script(topic)
+            if script:
+                scripts[topic] = script
+
+        print(f"✅ {len(scripts)}/{len(unique)} scripts ready "
+              f"({len(unique) - len(missing)} cached, {requests_made} requests)")
+        return scripts
+
+    def create_voiceover(self, text, filename=None, scenes=None):
+        """Write a voiceover for this run; with `scenes`, each scene is synthesized separately and joined"""
+        voice_path = self.temp_dir / (filename or f"voiceover_{uuid.uuid4().hex}.mp3")
         try:
-            print("🔊 Generating voiceover...")
-            tts = gTTS(text=text, lang='en', slow=False)
-            tts.save(str(voice_path))
+            if scenes:
+                texts = [scene['text'] for scene in scenes if scene['text'].strip()]
+                print(f"🔊 Generating voiceover for {len(texts)} scenes...")
+                with ThreadPoolExecutor(max_workers=max(1, min(TTS_WORKERS, len(texts)))) as executor:
+                    parts = list(executor.map(synthesize_speech, texts))
+            else:
+                print("🔊 Generating voiceover...")
+                parts = [synthesize_speech(text)]
+
+            # gTTS output is a plain MPEG audio stream, so pieces join byte-for-byte
+            with open(voice_path, "wb") as out:
+                for part in parts:
+                    with open(part, "rb") as f:
+                        shutil.copyfileobj(f, out)
             print(f"✅ Voiceover saved at {voice_path}")
             return str(voice_path)
         except Exception as e:
             print(f"❌ Voiceover error: {e}")
             return None
 
-    def generate_ai_image(self, prompt, image_source_choice):
-        img_path = self.safe_filename(prompt)
-        if img_path.exists():
-            return str(img_path)
-        generated_path = generate_image(prompt, str(img_path), image_source_choice)
+    def generate_ai_image(self, prompt, image_source_choice, size=None):
+        generated_path = generate_image(prompt, image_source_choice, size=size)
         if generated_path and Path(generated_path).exists():
             return generated_path
         fallback = self.assets_dir / "placeholder_bg.jpeg"
         return str(fallback)
 
-    def create_visual_clip(self, visual_desc, duration, size=(1280, 720), image_source_choice="1"):
-        prompt = re.sub(r'^[Vv]isuals?:\s*', '', visual_desc.strip())[:200].strip()
-        if not prompt or any(k in prompt.lower() for k in ['music', 'audio', 'sound']):
-            prompt = "technology abstract background"
-
-        img_path = self.generate_ai_image(prompt, image_source_choice)
+    def prefetch_images(self, scenes, image_source_choice, max_workers=IMAGE_PREFETCH_WORKERS, size=None):
+        """Fetch every scene image concurrently, returns {prompt: image path}"""
+        prompts = list(dict.fromkeys(scene_prompt(scene['visuals']) for scene in scenes))
+        if not prompts:
+            return {}
+
+        started = time.perf_counter()
+        if image_source_choice == "2":
+            # Async provider: every request in flight at once on the shared HTTP layer, no thread per call
+            print(f"🖼️ Prefetching {len(prompts)} images...")
+            images = http_client.run(afetch_images(prompts, size))
+            print(f"✅ Prefetched {len(images)} images in {time.perf_counter() - started:.1f}s")
+            return images
+
+        print(f"🖼️ Prefetching {len(prompts)} images with {min(max_workers, len(prompts))} workers...")
+        images = {}
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(prompts))) as executor:
+            futures = {
+                executor.submit(self.generate_ai_image, prompt, image_source_choice, size): prompt
+                for prompt in prompts
+            }
+            for future in as_completed(futures):
+                prompt = futures[future]
+                try:
+                    images[prompt] = future.result()
+                except Exception as e:
+                    print(f"❌ Error prefetching image for {prompt}: {e}")
+                    images[prompt] = str(self.assets_dir / "placeholder_bg.jpeg")
+        print(f"✅ Prefetched {len(images)} images in {time.perf_counter() - started:.1f}s")
+        return images
+
+    def create_visual_clip(self, visual_desc, duration, size=VIDEO_SIZE, image_source_choice="1", img_path=None):
+        if img_path is None:
+            img_path = self.generate_ai_image(scene_prompt(visual_desc), image_source_choice, size)
         try:
-            clip = ImageClip(img_path).set_duration(duration).resize(newsize=size)
+            # Scaled once up front; MoviePy then just repeats the ready frame
+            clip = ImageClip(load_frame(img_path, size)).set_duration(duration)
             return clip
         except:
             return ColorClip(size, color=(30, 30, 60), duration=duration)
 
-    def create_video(self, topic):
-        print(f"\n🚀 Creating video: {topic}")
-        image_source_choice = input("Select image source (1: Freepik, 2: Pollinations): ").strip()
-        script = self.generate_script(topic)
-        if not script:
-            print("❌ Script generation failed")
-            return None
-
-        cleaned_script = clean_script_text(script)
-        voiceover_path = self.create_voiceover(cleaned_script)
-        if not voiceover_path:
-            print("❌ Voiceover creation failed")
-            return None
-
+    def load_audio(self, voiceover_path):
         audio_clip = AudioFileClip(voiceover_path)
         if audio_clip.duration < 1:
-            print("❌ Audio too short")
-            return None
+            audio_clip.close()
+            raise RuntimeError("Audio too short")
+        return audio_clip
 
-        scenes = parse_script(script)
-        if not scenes:
-            print("❌ No scenes parsed")
-            return None
-
-        # ✅ Generate visual clips
+    def create_background_clip(self, scenes, images, audio_clip, image_source_choice, size=VIDEO_SIZE):
         visual_clips = []
         for i, scene in enumerate(scenes):
             clip = self.create_visual_clip(
                 scene['visuals'],
                 scene['duration'],
-                image_source_choice=image_source_choice
+                size=size,
+                image_source_choice=image_source_choice,
+                img_path=images.get(scene_prompt(scene['visuals']))
             ).set_start(scene['start'])
 
             # ✅ If it's the last scene → extend to end of audio
@@ -258,60 +461,251 @@ Generate the most viral-worthy version possible that maximizes shareability and
             visual_clips.append(clip)
 
         # ✅ Background covers full audio duration
-        bg_clip = CompositeVideoClip(visual_clips, size=(1280, 720)).set_duration(audio_clip.duration)
+        return CompositeVideoClip(visual_clips, size=size).set_duration(audio_clip.duration)
 
-        # Subtitles - Improved to handle all scenes properly
-        text_clips = []
-        for scene in scenes:
-            # Skip empty text
-            if not scene['text'].strip():
-                continue
-                
-            # Create text clip with better styling for visibility
+    def create_background_layers(self, scenes, images, audio_clip, size=VIDEO_SIZE):
+        """Layer equivalent of create_background_clip for the static/ffmpeg backends: one pre-scaled frame per scene"""
+        layers = []
+        for i, scene in enumerate(scenes):
+            img_path = images.get(scene_prompt(scene['visuals']))
             try:
-                txt_clip = TextClip(
-                    scene['text'], 
-                    fontsize=42, 
-                    color='white', 
-                    font='Arial-Bold',
-                    stroke_color='black', 
-                    stroke_width=2, 
-                    size=(1000, None),
-                    method='caption', 
-                    align='center',
-                    bg_color='rgba(0,0,0,0.5)',
-                    transparent=True
-                ).set_position(('center', 550)).set_start(scene['start']).set_duration(scene['duration'])
-                text_clips.append(txt_clip)
-            except Exception as e:
-                print(f"⚠️ Could not create subtitle for scene: {e}")
-
+                frame = load_frame(img_path, size)
+            except Exception:
+                frame = np.full((size[1], size[0], 3), (30, 30, 60), dtype="uint8")
+
+            # ✅ Last scene runs to the end of the audio
+            end = audio_clip.duration if i == len(scenes) - 1 else scene['start'] + scene['duration']
+            layers.append(make_layer(frame, scene['start'], end))
+        return layers
+
+    def create_subtitle_layers(self, scenes, size=VIDEO_SIZE):
+        # Subtitles - rasterized with Pillow (no ImageMagick subprocess per scene)
+        scenes = [scene for scene in scenes if scene['text'].strip()]
+        started = time.perf_counter()
+        overlays = render_subtitles([scene['text'] for scene in scenes], style_for_canvas(size))
+        y = subtitle_y(size)
+        layers = [
+            make_layer(overlay, scene['start'], scene['start'] + scene['duration'], (center_x(overlay, size), y))
+            for scene, overlay in zip(scenes, overlays)
+        ]
+        print(f"✅ Rendered {len(layers)} subtitles in {time.perf_counter() - started:.2f}s")
+        return layers
+
+    def create_subtitle_clips(self, scenes, size=VIDEO_SIZE):
+        return [
+            ImageClip(layer["frame"], transparent=True)
+            .set_position(('center', layer["pos"][1])).set_start(layer["start"]).set_duration(layer["end"] - layer["start"])
+            for layer in self.create_subtitle_layers(scenes, size)
+        ]
+
+    def output_path_for(self, topic, image_source_choice=None, render_profile=None):
+        """output/<Topic>.mp4, or output/<Topic>__<profile>_src<n>.mp4 so other settings never overwrite it"""
+        name = re.sub(r'[^a-zA-Z0-9_]', '', topic.replace(' ', '_'))
+        if image_source_choice is not None or render_profile is not None:
+            name += f"__{render_profile or self.render_profile}_src{image_source_choice}"
+        return self.output_dir / f"{name}.mp4"
+
+    def render_video(self, output_path, bg_clip, text_clips, audio_clip, profile):
         # Create final video with all elements
-        final_clip = CompositeVideoClip([bg_clip] + text_clips)
+        final_clip = CompositeVideoClip([bg_clip] + text_clips, size=profile["size"])
         final_clip = final_clip.set_audio(audio_clip).set_duration(audio_clip.duration)
 
-        output_path = self.output_dir / f"{re.sub(r'[^a-zA-Z0-9_]', '', topic.replace(' ', '_'))}.mp4"
-        
-        # Write video file with optimized settings
+        # Write video file with the profile's encoder settings
         final_clip.write_videofile(
             str(output_path), 
             codec="libx264", 
             audio_codec="aac", 
-            fps=24, 
-            threads=4,
-            preset='fast',
-            ffmpeg_params=['-crf', '23']
+            **encoder_settings(profile)
         )
+        return output_path
+
+    def render_layers(self, output_path, layers, audio_clip, profile, backend):
+        """Render precomputed layers with the "static" (frame pipe) or "ffmpeg" (still segments) backend"""
+        writer = write_segmented_video if backend == "ffmpeg" else write_static_video
+        return writer(
+            layers,
+            profile["size"],
+            audio_clip,
+            output_path,
+            self.temp_dir,
+            codec="libx264",
+            audio_codec="aac",
+            **encoder_settings(profile)
+        )
+
+    def timed_render(self, backend, render, *args):
+        started = time.perf_counter()
+        output_path = render(*args)
+        print(f"⏱️ Render with {backend} backend took {time.perf_counter() - started:.1f}s")
+        return output_path
+
+    def build_pipeline(self, topic, image_source_choice, render_backend=None, render_profile=None):
+        """Stage graph for one video: TTS, images and subtitles run in parallel once the script arrives"""
+        profile = get_render_profile(render_profile or self.render_profile)
+        size = profile["size"]
+        print(f"🎛️ Render profile: {profile['name']} {size[0]}x{size[1]} @ {profile['fps']}fps")
+        output_path = self.output_path_for(topic, image_source_choice, profile["name"])
+
+        def script_stage():
+            script = self.generate_script(topic)
+            if not script:
+                raise RuntimeError("Script generation failed")
+            return script
+
+        def voiceover_stage(script, scenes):
+            if self.per_scene_tts:
+                voiceover_path = self.create_voiceover(None, scenes=scenes)
+            else:
+                voiceover_path = self.create_voiceover(clean_script_text(script))
+            if not voiceover_path:
+                raise RuntimeError("Voiceover creation failed")
+            return voiceover_path
+
+        def scenes_stage(script):
+            scenes = parse_script(script)
+            if not scenes:
+                raise RuntimeError("No scenes parsed")
+            return scenes
+
+        graph = StageGraph(name=f"video '{topic[:40]}'")
+        graph.add("script", script_stage)
+        graph.add("scenes", scenes_stage, deps=["script"])
+        graph.add("voiceover", voiceover_stage, deps=["script", "scenes"])
+        graph.add("audio", self.load_audio, deps=["voiceover"])
+        graph.add("images", lambda scenes: self.prefetch_images(scenes, image_source_choice, size=size), deps=["scenes"])
+        backend = render_backend or self.render_backend
+        if backend in ("static", "ffmpeg"):
+            graph.add("subtitles", lambda scenes: self.create_subtitle_layers(scenes, size), deps=["scenes"])
+            graph.add(
+                "background",
+                lambda scenes, images, audio: self.create_background_layers(scenes, images, audio, size),
+                deps=["scenes", "images", "audio"]
+            )
+            graph.add(
+                "render",
+                lambda background, subtitles, audio: self.timed_render(
+                    backend, self.render_layers, output_path, background + subtitles, audio,
+                    tune_for_duration(profile, audio.duration), backend
+                ),
+                deps=["background", "subtitles", "audio"]
+            )
+        else:
+            graph.add("subtitles", lambda scenes: self.create_subtitle_clips(scenes, size), deps=["scenes"])
+            graph.add(
+                "background",
+                lambda scenes, images, audio: self.create_background_clip(scenes, images, audio, image_source_choice, size),
+                deps=["scenes", "images", "audio"]
+            )
+            graph.add(
+                "render",
+                lambda background, subtitles, audio: self.timed_render(
+                    backend, self.render_video, output_path, background, subtitles, audio,
+                    tune_for_duration(profile, audio.duration)
+                ),
+                deps=["background", "subtitles", "audio"]
+            )
+        return graph
+
+    def run_pipeline(self, topic, image_source_choice, render_backend=None, render_profile=None):
+        """Run every stage for one topic; returns the output path or None on failure"""
+        try:
+            graph = self.build_pipeline(topic, image_source_choice, render_backend, render_profile)
+        except Exception as e:
+            print(f"❌ {e}")
+            return None
+        try:
+            return graph.run()["render"]
+        except Exception as e:
+            print(f"❌ {type(e).__name__}: {e}")
+            return None
+        finally:
+            graph.report()
+            # Per-run voiceover is only needed until the render is written (or the run failed)
+            if "audio" in graph.results:
+                graph.results["audio"].close()
+            if "voiceover" in graph.results:
+                Path(graph.results["voiceover"]).unlink(missing_ok=True)
+
+    def cached_render(self, topic, image_source_choice, render_backend=None, render_profile=None):
+        """run_pipeline behind the render cache, with identical in-flight requests sharing one render"""
+        profile_name = render_profile or self.render_profile
+        backend = render_backend or self.render_backend
+        key = render_cache_key(topic, image_source_choice, profile_name, backend, self.per_scene_tts, PIPELINE_VERSION)
+        cache = get_render_cache()
+        output_path = self.output_path_for(topic, image_source_choice, profile_name)
+
+        with _inflight_lock:
+            future = _inflight_renders.get(key)
+            owner = future is None
+            if owner:
+                future = _inflight_renders[key] = Future()
+
+        if not owner:
+            print(f"⏳ Same video is already rendering, sharing its result: {topic}")
+            cached = future.result()
+        else:
+            cached = None
+            try:
+                cached = cache.get(key, max_age=RENDER_CACHE_TTL)
+                if cached is None:
+                    started = time.perf_counter()
+                    rendered = self.run_pipeline(topic, image_source_choice, render_backend, render_profile)
+                    if rendered is not None:
+                        try:
+                            cached = cache.put_file(key, rendered, meta={
+                                "topic": topic, "image_source": image_source_choice, "render_profile": profile_name,
+                                "render_backend": backend, "per_scene_tts": self.per_scene_tts,
+                                "pipeline_version": PIPELINE_VERSION,
+                                "render_seconds": round(time.perf_counter() - started, 1),
+                            })
+                        except Exception as e:
+                            # The mp4 is written; only the cache copy failed (disk full, etc.)
+                            print(f"⚠️ Could not cache render: {e}")
+                            cached = rendered
+                        return rendered
+                else:
+                    meta = cache.get_meta(key) or {}
+                    print(f"⚡ Render cache hit: {topic} (originally rendered in {meta.get('render_seconds', '?')}s)")
+            finally:
+                with _inflight_lock:
+                    _inflight_renders.pop(key, None)
+                future.set_result(cached)
+
+        if cached is None:
+            return None
+        if Path(cached) == output_path:
+            return output_path  # the owner's render could not be cached; it is already at this path
+        # Copy then rename, so a reader of an earlier output at this path never sees a half-written file
+        tmp_path = output_path.with_name(f".{output_path.name}.{uuid.uuid4().hex}")
+        shutil.copyfile(cached, tmp_path)
+        os.replace(tmp_path, output_path)
+        return output_path
+
+    def create_video(self, topic, image_source_choice=None, render_backend=None, render_profile=None, upload=True,
+                     uploader=None, use_cache=RENDER_CACHE):
+        print(f"\n🚀 Creating video: {topic}")
+        if image_source_choice is None:
+            image_source_choice = input("Select image source (1: Freepik, 2: Pollinations): ").strip()
+
+        if use_cache:
+            output_path = self.cached_render(topic, image_source_choice, render_backend, render_profile)
+        else:
+            output_path = self.run_pipeline(topic, image_source_choice, render_backend, render_profile)
+        if output_path is None:
+            return None
 
         print(f"\n🎉 Video created successfully: {output_path}")
+        if not upload:
+            return str(output_path)
 
-        # Upload to YouTube
+        # Upload just this video: hand it to the caller's long-lived worker, or run one for this call
         try:
-            print("📤 Uploading to YouTube...")
-            # async def upload(): 
-            #     await upload_video(str(output_path), topic, f"Automated video about {topic}", ["AI","Automation","Tech"])
-            # asyncio.run(upload())
-            asyncio.run(batch_upload()) # print("✅ Upload initiated")
+            if uploader is not None:
+                uploader.submit(output_path, topic, f"Automated video about {topic}")
+            else:
+                print("📤 Uploading to YouTube...")
+                with UploadWorker() as own_uploader:
+                    own_uploader.submit(output_path, topic, f"Automated video about {topic}")
         except Exception as e:
             print(f"⚠️ YouTube upload failed: {e}")
 
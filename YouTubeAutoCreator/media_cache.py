@@ -0,0 +1,248 @@
+import os
+import json
+import atexit
+import time
+import shutil
+import hashlib
+import tempfile
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+# -----------------------------
+# Content-addressed media cache
+# -----------------------------
+class MediaCache:
+    """File cache keyed by a hash of its inputs, bounded by a byte budget.
+
+    Entries are `<sha256><ext>` files under `root`; `index.json` tracks size and
+    last access for LRU eviction. Writes go through a temp file + `os.replace`
+    under an OS file lock, so several render processes can share one directory.
+    """
+
+    INDEX_NAME = "index.json"
+    TOUCH_FLUSH_INTERVAL = 30.0  # seconds
+
+    def __init__(self, root, max_bytes):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.index_path = self.root / self.INDEX_NAME
+        self.lock_path = self.root / "index.lock"
+        self._lock = threading.RLock()
+        self._index_mtime = None
+        self._index = self._load_index()
+        self._touched = {}  # key -> access time not yet written to the index
+        self._last_flush = time.monotonic()
+        atexit.register(self.flush)
+
+    @staticmethod
+    def make_key(*parts):
+        raw = "\x1f".join(str(p) for p in parts)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    # ---------- index ----------
+    def _index_stamp(self):
+        try:
+            st = self.index_path.stat()
+            # os.replace gives every saved index a new inode, so this changes even on coarse mtime filesystems
+            return (st.st_mtime_ns, st.st_ino, st.st_size)
+        except FileNotFoundError:
+            return None
+
+    def _load_index(self):
+        self._index_mtime = self._index_stamp()
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _save_index(self):
+        self._atomic_write(self.index_path, json.dumps(self._index).encode("utf-8"))
+        self._index_mtime = self._index_stamp()
+        self._touched.clear()
+        self._last_flush = time.monotonic()
+
+    def _apply_touches(self):
+        # Re-apply our unsaved hits on top of an index another process just saved
+        for key, atime in self._touched.items():
+            if key in self._index:
+                self._index[key]["atime"] = max(self._index[key]["atime"], atime)
+
+    @contextmanager
+    def _locked(self):
+        """Thread lock + cross-process file lock around an up-to-date index"""
+        with self._lock:
+            with open(self.lock_path, "a+b") as lock_file:
+                if fcntl:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                else:
+                    lock_file.seek(0)
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+                try:
+                    if self._index_stamp() != self._index_mtime:
+                        self._index = self._load_index()
+                        self._apply_touches()
+                    yield
+                finally:
+                    if fcntl:
+                        fcntl.flock(lock_file, fcntl.LOCK_UN)
+                    else:
+                        lock_file.seek(0)
+                        msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def _atomic_write(self, path, data):
+        fd, tmp = tempfile.mkstemp(dir=self.root, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+
+    # ---------- public API ----------
+    def get(self, key, max_age=None):
+        """Path of the cached entry, or None. Marks the entry as recently used.
+
+        With `max_age` (seconds), entries written longer ago than that are dropped.
+        """
+        with self._locked():
+            entry = self._index.get(key)
+            if entry is None:
+                return None
+            path = self.root / entry["file"]
+            expired = max_age is not None and time.time() - entry.get("ctime", entry["atime"]) > max_age
+            if expired or not path.exists():
+                # Stale, or removed behind our back; forget it
+                path.unlink(missing_ok=True)
+                del self._index[key]
+                self._save_index()
+                return None
+            entry["atime"] = self._touched[key] = time.time()
+            if time.monotonic() - self._last_flush > self.TOUCH_FLUSH_INTERVAL:
+                self._save_index()
+            return path
+
+    def flush(self):
+        """Write pending access times to the index (also runs at exit)"""
+        if not self._touched:
+            return
+        with self._locked():
+            self._save_index()
+
+    def put_bytes(self, key, data, ext=""):
+        with self._locked():
+            path = self.root / f"{key}{ext}"
+            self._atomic_write(path, data)
+            return self._record(key, path)
+
+    def get_meta(self, key):
+        """Metadata stored with the entry by put_file(meta=...), or None"""
+        with self._locked():
+            entry = self._index.get(key)
+            return dict(entry.get("meta") or {}) if entry else None
+
+    def put_file(self, key, src_path, ext=None, meta=None):
+        """Copy an existing file into the cache, optionally with a small JSON-able `meta` dict"""
+        src_path = Path(src_path)
+        ext = src_path.suffix if ext is None else ext
+        with self._locked():
+            path = self.root / f"{key}{ext}"
+            fd, tmp = tempfile.mkstemp(dir=self.root, prefix=".tmp-")
+            os.close(fd)
+            try:
+                shutil.copyfile(src_path, tmp)
+                os.replace(tmp, path)
+            except BaseException:
+                Path(tmp).unlink(missing_ok=True)
+                raise
+            return self._record(key, path, meta)
+
+    def total_bytes(self):
+        with self._locked():
+            return sum(e["size"] for e in self._index.values())
+
+    def _record(self, key, path, meta=None):
+        now = time.time()
+        self._index[key] = {"file": path.name, "size": path.stat().st_size, "atime": now, "ctime": now}
+        if meta:
+            self._index[key]["meta"] = meta
+        self._evict(keep=key)
+        self._save_index()
+        return path
+
+    def _evict(self, keep=None):
+        total = sum(e["size"] for e in self._index.values())
+        if total <= self.max_bytes:
+            return
+        for key, entry in sorted(self._index.items(), key=lambda item: item[1]["atime"]):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            (self.root / entry["file"]).unlink(missing_ok=True)
+            total -= entry["size"]
+            del self._index[key]
+            print(f"🧹 Evicted cached file {entry['file']} ({entry['size']} bytes)")
+
+
+# -----------------------------
+# Shared instances
+# -----------------------------
+_shared_caches = {}
+_shared_caches_lock = threading.Lock()
+
+
+def _shared_cache(name, default_dir, default_max_mb):
+    with _shared_caches_lock:
+        if name not in _shared_caches:
+            root = os.getenv(f"{name}_CACHE_DIR", default_dir)
+            max_mb = int(os.getenv(f"{name}_CACHE_MAX_MB", str(default_max_mb)))
+            _shared_caches[name] = MediaCache(root, max_mb * 1024 * 1024)
+        return _shared_caches[name]
+
+
+def get_image_cache():
+    """Process-wide image cache (IMAGE_CACHE_DIR, IMAGE_CACHE_MAX_MB)"""
+    return _shared_cache("IMAGE", "temp/image_cache", 500)
+
+
+def get_tts_cache():
+    """Process-wide voiceover cache (TTS_CACHE_DIR, TTS_CACHE_MAX_MB)"""
+    return _shared_cache("TTS", "temp/tts_cache", 200)
+
+
+def get_render_cache():
+    """Process-wide finished-video cache (RENDER_CACHE_DIR, RENDER_CACHE_MAX_MB)"""
+    return _shared_cache("RENDER", "temp/render_cache", 5000)
+
+
+def image_cache_key(provider, prompt, resolution=None):
+    resolution = f"{resolution[0]}x{resolution[1]}" if resolution else "default"
+    return MediaCache.make_key(provider, prompt, resolution)
+
+
+def tts_cache_key(text, lang="en", slow=False):
+    text_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    return MediaCache.make_key("gtts", text_hash, lang, bool(slow))
+
+
+def normalize_topic(topic):
+    """Case, whitespace and trailing punctuation don't change what gets rendered"""
+    return " ".join(topic.lower().split()).strip(" .!?")
+
+
+def render_cache_key(topic, image_source_choice, render_profile, render_backend, per_scene_tts, pipeline_version):
+    return MediaCache.make_key(
+        "render", normalize_topic(topic), image_source_choice, render_profile, render_backend, bool(per_scene_tts),
+        pipeline_version
+    )
@@ -1,30 +1,18 @@
-import json
+import os
 from pathlib import Path
-from playwright.sync_api import sync_playwright
+from auth_service import convert_cookie_file
 #playwright codegen --load-storage=youtube_storage.json https://youtube.com on terminal
-COOKIE_FILE = Path("youtube_cookies.json")
-STORAGE_STATE_FILE = Path("youtube_storage.json")
+COOKIE_FILE = Path(os.getenv("COOKIE_FILE", "youtube_cookies.json"))
+STORAGE_STATE_FILE = Path(os.getenv("STORAGE_STATE_FILE", "youtube_storage.json"))
 
 def convert_cookies_to_storage_state():
     if not COOKIE_FILE.exists():
         print("❌ Cookies file not found!")
         return
 
-    with open(COOKIE_FILE, "r", encoding="utf-8") as f:
-        cookies = json.load(f)
-
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=False, channel="chrome")
-        context = browser.new_context(viewport=None)
-
-        # Add cookies to the context
-        context.add_cookies(cookies)
-
-        # Save storage state for Playwright codegen
-        context.storage_state(path=str(STORAGE_STATE_FILE))
-        print(f"✅ Storage state saved to {STORAGE_STATE_FILE}")
-
-        browser.close()
+    # Storage state is just the cookies plus (empty) origins: plain JSON, no browser needed
+    convert_cookie_file(COOKIE_FILE, STORAGE_STATE_FILE)
+    print(f"✅ Storage state saved to {STORAGE_STATE_FILE}")
 
 if __name__ == "__main__":
     convert_cookies_to_storage_state()
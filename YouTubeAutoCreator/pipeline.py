@@ -0,0 +1,98 @@
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+
+# -----------------------------
+# Stage graph executor
+# -----------------------------
+class StageGraph:
+    """Run named stages on a thread pool as soon as their dependencies are done.
+
+    Each stage is called with the results of its dependencies as positional
+    arguments, in the order they were declared. Timings are recorded relative
+    to the start of `run()` so the critical path can be reported afterwards.
+    """
+
+    def __init__(self, name="pipeline", max_workers=4):
+        self.name = name
+        self.max_workers = max_workers
+        self.stages = {}  # name: (fn, deps)
+        self.timings = {}  # name: (start, end) in seconds since run() began
+        self.results = {}  # results of the last run(), partial if it failed
+        self._lock = threading.Lock()
+
+    def add(self, name, fn, deps=()):
+        if name in self.stages:
+            raise ValueError(f"Stage already defined: {name}")
+        missing = [d for d in deps if d not in self.stages]
+        if missing:
+            raise ValueError(f"Stage {name} depends on unknown stages: {missing}")
+        self.stages[name] = (fn, tuple(deps))
+        return self
+
+    def _timed(self, name, fn, args, t0):
+        start = time.perf_counter() - t0
+        try:
+            return fn(*args)
+        finally:
+            with self._lock:
+                self.timings[name] = (start, time.perf_counter() - t0)
+
+    def run(self):
+        """Execute all stages, returns {stage name: result}. Re-raises the first stage error.
+
+        On failure, stages already running are allowed to finish and whatever
+        succeeded stays in `self.results`, so the caller can release it.
+        """
+        results = self.results = {}
+        pending = dict(self.stages)
+        running = {}
+        t0 = time.perf_counter()
+        self.timings.clear()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            try:
+                while pending or running:
+                    ready = [n for n, (_, deps) in pending.items() if all(d in results for d in deps)]
+                    for name in ready:
+                        fn, deps = pending.pop(name)
+                        args = [results[d] for d in deps]
+                        running[executor.submit(self._timed, name, fn, args, t0)] = name
+
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        name = running.pop(future)
+                        results[name] = future.result()
+            except BaseException:
+                for future in running:
+                    future.cancel()
+                for future in wait(running).done:
+                    if not future.cancelled() and future.exception() is None:
+                        results[running[future]] = future.result()
+                raise
+
+        return results
+
+    def critical_path(self):
+        """Chain of stages that determined total wall-clock time"""
+        if not self.timings:
+            return []
+        name = max(self.timings, key=lambda n: self.timings[n][1])
+        path = [name]
+        while True:
+            deps = [d for d in self.stages[name][1] if d in self.timings]
+            if not deps:
+                break
+            name = max(deps, key=lambda n: self.timings[n][1])
+            path.append(name)
+        return list(reversed(path))
+
+    def report(self):
+        if not self.timings:
+            return
+        total = max(end for _, end in self.timings.values())
+        print(f"⏱️ {self.name} stage timings ({total:.1f}s total):")
+        for name, (start, end) in sorted(self.timings.items(), key=lambda item: item[1][0]):
+            print(f"   {name:<12} {start:7.2f}s → {end:7.2f}s  ({end - start:.2f}s)")
+        print(f"   critical path: {' → '.join(self.critical_path())}")
@@ -0,0 +1,241 @@
+import os
+import time
+import shutil
+import asyncio
+import itertools
+from multiprocessing import Manager
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Optional
+
+from batch_render import _init_worker, render_topic
+from main import PIPELINE_VERSION, RENDER_BACKEND, TTS_PER_SCENE
+from media_cache import render_cache_key
+from render_profiles import DEFAULT_RENDER_PROFILE, available_cores
+
+RENDER_WORKERS = int(os.getenv("BOT_RENDER_WORKERS", str(max(1, available_cores() // 4))))
+MAX_JOBS_PER_USER = int(os.getenv("BOT_MAX_JOBS_PER_USER", "2"))  # queued + running
+NETWORK_LIMIT = int(os.getenv("BOT_NETWORK_LIMIT", "8"))
+
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+
+
+class QueueLimitError(Exception):
+    pass
+
+
+class RenderJob:
+    def __init__(self, job_id, user_id, topic, image_source_choice, render_profile, priority):
+        self.id = job_id
+        self.user_id = user_id
+        self.topic = topic
+        self.image_source_choice = image_source_choice
+        self.render_profile = render_profile
+        self.priority = priority
+        self.status = "queued"  # queued → running → done | failed | cancelled
+        # Workers render with main's defaults, so share main's cache key (and its PIPELINE_VERSION)
+        self.key = render_cache_key(topic, image_source_choice, render_profile or DEFAULT_RENDER_PROFILE,
+                                    RENDER_BACKEND, TTS_PER_SCENE, PIPELINE_VERSION)
+        self.primary = None  # job already rendering the same video, if this one just waits for it
+        self.followers = []
+        self.future = asyncio.get_running_loop().create_future()
+        self.submitted_at = time.perf_counter()
+        self.started_at = None
+        self.crashes = 0  # times the pool died under this job
+
+    def __lt__(self, other):
+        return self.id < other.id
+
+
+# -----------------------------
+# Bot render queue
+# -----------------------------
+class RenderQueue:
+    """Priority FIFO of render jobs served by a bounded process pool.
+
+    Workers reuse batch_render's process setup (shared network semaphore,
+    encoder threads split across processes), so a burst of requests queues
+    up instead of fighting over cores and the bot's GIL. Each user may have
+    at most MAX_JOBS_PER_USER jobs queued or running.
+
+        job = render_queue.submit(user_id, topic, "2")
+        output = await job.future
+    """
+
+    def __init__(self, workers: int = RENDER_WORKERS, max_per_user: int = MAX_JOBS_PER_USER,
+                 network_limit: int = NETWORK_LIMIT):
+        self.workers = workers
+        self.max_per_user = max_per_user
+        self.network_limit = network_limit
+        self._ids = itertools.count(1)
+        self._jobs = {}  # id -> RenderJob (queued or running)
+        self._queue = None
+        self._executor = None
+        self._manager = None
+        self._dispatchers = []
+        self._isolated = None  # single-process pool for jobs that were running when a worker died
+        self._isolation_lock = asyncio.Lock()
+
+    def start(self):
+        if self._executor is not None:
+            return
+        self._queue = asyncio.PriorityQueue()
+        self._manager = Manager()
+        render_threads = max(1, available_cores() // self.workers)
+        self._initargs = (self._manager.BoundedSemaphore(self.network_limit), render_threads)
+        self._executor = self._make_executor()
+        self._dispatchers = [asyncio.create_task(self._dispatch()) for _ in range(self.workers)]
+        print(f"🏭 Bot render queue: {self.workers} worker processes, {self.max_per_user} jobs per user")
+
+    def _make_executor(self):
+        return ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker, initargs=self._initargs)
+
+    def _rebuild_executor(self, broken):
+        # Every dispatcher sharing the dead pool gets BrokenProcessPool; only the first one replaces it
+        if self._executor is broken:
+            print("♻️ A render worker died, restarting the render pool")
+            broken.shutdown(wait=False, cancel_futures=True)
+            self._executor = self._make_executor()
+
+    async def _run_isolated(self, loop, job):
+        """Run a job on its own worker, one at a time, so a crash there pins down the job that caused it"""
+        async with self._isolation_lock:
+            if self._isolated is None:
+                self._isolated = ProcessPoolExecutor(max_workers=1, initializer=_init_worker, initargs=self._initargs)
+            try:
+                return await loop.run_in_executor(
+                    self._isolated, render_topic, job.topic, job.image_source_choice, None, job.render_profile
+                )
+            except BrokenProcessPool as e:
+                self._isolated.shutdown(wait=False)
+                self._isolated = None
+                raise RuntimeError(f"Render worker crashed: {e}") from e
+
+    async def close(self):
+        for task in self._dispatchers:
+            task.cancel()
+        for executor in (self._executor, self._isolated):
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+        self._executor = self._isolated = None
+        if self._manager is not None:
+            self._manager.shutdown()
+            self._manager = None
+
+    def submit(self, user_id, topic: str, image_source_choice: str, render_profile: Optional[str] = None,
+               priority: int = PRIORITY_NORMAL) -> RenderJob:
+        self.start()
+        active = self.user_jobs(user_id)
+        if len(active) >= self.max_per_user:
+            raise QueueLimitError(f"You already have {len(active)} videos in progress (limit {self.max_per_user}).")
+        job = RenderJob(next(self._ids), user_id, topic, image_source_choice, render_profile, priority)
+        self._jobs[job.id] = job
+        # Same topic/source/profile already queued or rendering: share that render instead of starting another
+        primary = next((j for j in self._jobs.values()
+                        if j.key == job.key and j.primary is None and j is not job and not j.future.done()), None)
+        if primary is not None:
+            job.primary = primary
+            primary.followers.append(job)
+            print(f"🔗 Render job #{job.id} shares #{primary.id}: {topic}")
+        else:
+            self._queue.put_nowait((priority, job))
+        return job
+
+    def user_jobs(self, user_id):
+        return [job for job in self._jobs.values() if job.user_id == user_id]
+
+    def position(self, job: RenderJob) -> int:
+        """1-based place among queued jobs (0 once running)"""
+        job = job.primary or job
+        if job.status != "queued":
+            return 0
+        ahead = [j for j in self._jobs.values() if j.status == "queued" and j.primary is None
+                 and (j.priority, j.id) < (job.priority, job.id)]
+        return len(ahead) + 1
+
+    def cancel(self, job: RenderJob) -> bool:
+        """Queued jobs never start; a running render finishes in its worker but the result is discarded.
+
+        A job that others are sharing keeps rendering for them.
+        """
+        if job.future.done():
+            return False
+        was_running = job.status == "running"
+        job.future.cancel()
+        self._jobs.pop(job.id, None)
+        if job.primary is not None:
+            job.primary.followers.remove(job)
+        elif not job.followers:
+            job.status = "cancelled"
+        print(f"🛑 Render job #{job.id} cancelled ({'running' if was_running else 'queued'})")
+        return True
+
+    def stats(self):
+        queued = sum(1 for j in self._jobs.values() if j.status == "queued" and j.primary is None)
+        running = sum(1 for j in self._jobs.values() if j.status == "running")
+        return {"queued": queued, "running": running, "workers": self.workers}
+
+    async def _dispatch(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            _, job = await self._queue.get()
+            if job.status == "cancelled" or job.future.done() and not job.followers:
+                continue
+            job.status = "running"
+            job.started_at = time.perf_counter()
+            print(f"🎬 Render job #{job.id} started after {job.started_at - job.submitted_at:.0f}s in queue: {job.topic}")
+            executor = self._executor
+            try:
+                if job.crashes:
+                    result = await self._run_isolated(loop, job)
+                else:
+                    result = await loop.run_in_executor(
+                        executor, render_topic, job.topic, job.image_source_choice, None, job.render_profile
+                    )
+            except BrokenProcessPool:
+                self._rebuild_executor(executor)
+                # Can't tell which job killed the pool: rerun each affected job on its own so only the culprit fails
+                job.crashes += 1
+                job.status = "queued"
+                print(f"🔁 Render job #{job.id} requeued after a render worker died")
+                self._queue.put_nowait((job.priority, job))
+                continue
+            except Exception as e:
+                job.status = "failed"
+                for waiter in [job] + job.followers:
+                    if not waiter.future.done():
+                        waiter.future.set_exception(e)
+            else:
+                job.status = "done"
+                # Every follower gets its own file (each handler moves its result away), made before anyone is woken
+                followers = [f for f in job.followers if not f.future.done()]
+                copies = [await asyncio.to_thread(_link_copy, result["output"], f.id) for f in followers]
+                for follower, copy in zip(followers, copies):
+                    if not follower.future.done():
+                        follower.status = "done"
+                        follower.future.set_result(copy)
+                    else:
+                        Path(copy).unlink(missing_ok=True)
+                if not job.future.done():
+                    job.future.set_result(result["output"])
+                elif job.future.cancelled():
+                    Path(result["output"]).unlink(missing_ok=True)
+            finally:
+                if job.status != "queued":
+                    for waiter in [job] + job.followers:
+                        self._jobs.pop(waiter.id, None)
+
+
+def _link_copy(path, job_id):
+    path = Path(path)
+    copy = path.with_name(f"{path.stem}_{job_id}{path.suffix}")
+    try:
+        os.link(path, copy)  # instant on the same filesystem
+    except OSError:
+        shutil.copyfile(path, copy)
+    return str(copy)
+
+
+render_queue = RenderQueue()
@@ -0,0 +1,98 @@
+import os
+
+
+# -----------------------------
+# Render profiles
+# -----------------------------
+# threads=None means "use every available core"; tune=None leaves x264's default.
+RENDER_PROFILES = {
+    "landscape-720p": {
+        "size": (1280, 720), "fps": 24, "preset": "fast", "crf": 23, "threads": 4, "tune": None,
+    },
+    "shorts-vertical-1080x1920": {
+        "size": (1080, 1920), "fps": 30, "preset": "medium", "crf": 21, "threads": None, "tune": "stillimage",
+    },
+    "draft-low-res": {
+        "size": (360, 640), "fps": 12, "preset": "ultrafast", "crf": 32, "threads": None, "tune": "stillimage",
+    },
+    "archive-quality": {
+        "size": (1080, 1920), "fps": 30, "preset": "slow", "crf": 16, "threads": None, "tune": "film",
+    },
+}
+
+DEFAULT_RENDER_PROFILE = os.getenv("RENDER_PROFILE", "landscape-720p")
+AUTO_PROFILE_BASE = os.getenv("RENDER_AUTO_BASE", "shorts-vertical-1080x1920")
+RENDER_TIME_BUDGET = float(os.getenv("RENDER_TIME_BUDGET", "120"))
+
+# Relative x264 encode cost per preset (ultrafast = 1), fastest first
+PRESET_COST = {
+    "ultrafast": 1.0,
+    "superfast": 1.4,
+    "veryfast": 2.0,
+    "faster": 2.8,
+    "fast": 3.5,
+    "medium": 4.5,
+    "slow": 7.0,
+    "slower": 12.0,
+}
+# Encoded megapixels per second per core at ultrafast; calibrate per render box
+ENCODE_MPIX_PER_CORE = float(os.getenv("ENCODE_MPIX_PER_CORE", "60"))
+
+
+def available_cores():
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def get_render_profile(name=None, time_budget=None):
+    """Resolved copy of a named profile. "auto" = RENDER_AUTO_BASE with the preset picked from a time budget."""
+    name = name or DEFAULT_RENDER_PROFILE
+    if name == "auto":
+        profile = dict(RENDER_PROFILES[AUTO_PROFILE_BASE], threads=None)
+        time_budget = time_budget or RENDER_TIME_BUDGET
+    elif name in RENDER_PROFILES:
+        profile = dict(RENDER_PROFILES[name])
+    else:
+        raise ValueError(f"Unknown render profile: {name} (choose from {', '.join(RENDER_PROFILES)} or auto)")
+
+    profile["name"] = name
+    if os.getenv("RENDER_THREADS"):
+        # Set by batch_render so parallel workers split the cores instead of oversubscribing
+        profile["threads"] = int(os.getenv("RENDER_THREADS"))
+    elif profile["threads"] is None:
+        profile["threads"] = available_cores()
+    profile["time_budget"] = time_budget
+    return profile
+
+
+def estimate_encode_seconds(profile, duration, preset=None):
+    width, height = profile["size"]
+    megapixels = duration * profile["fps"] * width * height / 1e6
+    cost = PRESET_COST.get(preset or profile["preset"], PRESET_COST["medium"])
+    return megapixels * cost / (ENCODE_MPIX_PER_CORE * profile["threads"])
+
+
+def tune_for_duration(profile, duration):
+    """Pick the slowest (best compressing) preset whose estimated encode time fits the profile's time budget"""
+    if not profile.get("time_budget"):
+        return profile
+    fitting = [p for p in PRESET_COST if estimate_encode_seconds(profile, duration, p) <= profile["time_budget"]]
+    tuned = dict(profile, preset=fitting[-1] if fitting else "ultrafast")
+    print(f"⚙️ Auto-tuned encoder: preset={tuned['preset']} threads={tuned['threads']} "
+          f"(~{estimate_encode_seconds(tuned, duration):.0f}s for a {tuned['time_budget']:.0f}s budget)")
+    return tuned
+
+
+def encoder_settings(profile):
+    """Keyword arguments for write_videofile / the frame writers"""
+    ffmpeg_params = ['-crf', str(profile["crf"])]
+    if profile.get("tune"):
+        ffmpeg_params += ['-tune', profile["tune"]]
+    return {
+        "fps": profile["fps"],
+        "threads": profile["threads"],
+        "preset": profile["preset"],
+        "ffmpeg_params": ffmpeg_params,
+    }
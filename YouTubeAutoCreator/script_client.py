@@ -0,0 +1,135 @@
+import os
+import threading
+from concurrent.futures import Future
+from contextlib import nullcontext
+
+import httpx
+
+import http_client
+from http_client import HttpError, get_http
+from media_cache import MediaCache, _shared_cache
+
+# -----------------------------
+# Config
+# -----------------------------
+GEMINI_API_BASE = os.getenv("GEMINI_API_BASE", "https://generativelanguage.googleapis.com")  # point at a local stub for testing
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.0-flash")
+SCRIPT_CACHE_TTL = int(os.getenv("SCRIPT_CACHE_TTL", str(30 * 24 * 3600)))  # seconds; 0 disables the cache
+
+
+class ScriptClientError(Exception):
+    pass
+
+
+def get_script_cache():
+    """Process-wide LLM response cache (SCRIPT_CACHE_DIR, SCRIPT_CACHE_MAX_MB)"""
+    return _shared_cache("SCRIPT", "temp/script_cache", 50)
+
+
+def script_cache_key(model, prompt):
+    return MediaCache.make_key("gemini", model, MediaCache.make_key(prompt))
+
+
+# -----------------------------
+# Gemini generateContent client
+# -----------------------------
+class GeminiClient:
+    """generateContent over the shared HTTP layer, with retries, an on-disk cache and request coalescing.
+
+    Responses are cached by (model, prompt hash). Identical prompts asked
+    concurrently from several threads make a single HTTP call. `slot` is an
+    optional context-manager factory held only around the HTTP request
+    (e.g. main.network_slot).
+    """
+
+    def __init__(self, api_key, model=GEMINI_MODEL, base_url=GEMINI_API_BASE, retries=4, backoff=1.0,
+                 timeout=60, slot=None):
+        self.api_key = api_key
+        self.model = model
+        self.base_url = base_url.rstrip("/")
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.slot = slot or nullcontext
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f"{self.base_url}/v1beta/models/{self.model}:generateContent"
+
+    def _cache_key(self, prompt, generation_config=None):
+        return script_cache_key(self.model, f"{prompt}\x1f{generation_config or ''}")
+
+    def lookup(self, prompt, generation_config=None):
+        """Cached response for `prompt`, or None"""
+        if SCRIPT_CACHE_TTL <= 0:
+            return None
+        cached = get_script_cache().get(self._cache_key(prompt, generation_config), max_age=SCRIPT_CACHE_TTL)
+        return cached.read_text(encoding="utf-8") if cached is not None else None
+
+    def store(self, prompt, text, generation_config=None):
+        """Seed the cache, e.g. with one topic's script split out of a batched response"""
+        if SCRIPT_CACHE_TTL > 0:
+            get_script_cache().put_bytes(self._cache_key(prompt, generation_config), text.encode("utf-8"), ext=".txt")
+
+    def generate(self, prompt, generation_config=None, use_cache=True):
+        """Text of the first candidate for `prompt`; raises ScriptClientError when every attempt failed"""
+        key = self._cache_key(prompt, generation_config)
+        use_cache = use_cache and SCRIPT_CACHE_TTL > 0
+        if use_cache:
+            cached = self.lookup(prompt, generation_config)
+            if cached is not None:
+                print("⚡ Script cache hit")
+                return cached
+
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+        if not owner:
+            return future.result()
+
+        try:
+            text = self._request(prompt, generation_config)
+            if use_cache:
+                self.store(prompt, text, generation_config)
+            future.set_result(text)
+            return text
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(key, None)
+
+    def _request(self, prompt, generation_config=None):
+        payload = {"contents": [{"parts": [{"text": prompt}]}]}
+        if generation_config:
+            payload["generationConfig"] = generation_config
+        headers = {"Content-Type": "application/json", "x-goog-api-key": self.api_key or ""}
+
+        try:
+            with self.slot():
+                response = http_client.run(get_http().post(
+                    self.url, headers=headers, json=payload, timeout=self.timeout,
+                    retries=self.retries, backoff=self.backoff
+                ))
+            response.raise_for_status()
+            data = response.json()
+            return data["candidates"][0]["content"]["parts"][0]["text"]
+        except (HttpError, httpx.HTTPStatusError, KeyError, IndexError, ValueError) as e:
+            raise ScriptClientError(f"Gemini request failed: {e}") from e
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_script_client(api_key, slot=None):
+    """Shared client per API key, so concurrent identical prompts coalesce across VideoCreators"""
+    with _clients_lock:
+        if api_key not in _clients:
+            _clients[api_key] = GeminiClient(api_key, slot=slot)
+        return _clients[api_key]
@@ -0,0 +1,141 @@
+import os
+import json
+import time
+import asyncio
+import threading
+from pathlib import Path
+
+import requests
+
+# -----------------------------
+# Config
+# -----------------------------
+PROBE_URL = os.getenv("SESSION_PROBE_URL", "https://www.youtube.com/account")
+SESSION_CHECK_TTL = int(os.getenv("SESSION_CHECK_TTL", "1800"))  # seconds a verdict is reused per user
+EXPIRY_MARGIN = 300  # treat cookies expiring within 5 minutes as already gone
+LOGIN_MARKERS = ("accounts.google.com/ServiceLogin", "accounts.google.com/v3/signin", "/signin")
+
+# Cookies Google needs for a signed-in YouTube session
+AUTH_COOKIES = {"SID", "HSID", "SSID", "APISID", "SAPISID", "__Secure-1PSID", "__Secure-3PSID", "LOGIN_INFO"}
+
+
+# -----------------------------
+# Cookie files
+# -----------------------------
+def load_cookies(path):
+    """Cookies from a cookie list file or a Playwright storage-state file; [] if missing/unreadable"""
+    path = Path(path)
+    if not path.exists():
+        return []
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return []
+    return data.get("cookies", []) if isinstance(data, dict) else data
+
+
+def _expires(cookie):
+    # Playwright/storage state uses "expires", browser-extension exports use "expirationDate"
+    return cookie.get("expires", cookie.get("expirationDate", -1))
+
+
+def cookie_expiry(cookies, now=None):
+    """("missing" | "expired" | "ok", earliest auth-cookie expiry or None) from the saved timestamps alone"""
+    now = now or time.time()
+    auth = [c for c in cookies if c.get("name") in AUTH_COOKIES]
+    if not auth:
+        return "missing", None
+    # expires <= 0 means a browser-session cookie: no timestamp to judge by
+    expiries = [_expires(c) for c in auth if (_expires(c) or -1) > 0]
+    earliest = min(expiries) if expiries else None
+    if earliest is not None and earliest < now + EXPIRY_MARGIN:
+        return "expired", earliest
+    return "ok", earliest
+
+
+def probe_session(cookies, timeout=10):
+    """One plain HTTP request with the cookies; True if YouTube doesn't bounce us to sign-in.
+
+    Returns None when the probe itself fails (network error), so callers can
+    fall back to the expiry verdict instead of forcing a re-login.
+    """
+    jar = requests.cookies.RequestsCookieJar()
+    for c in cookies:
+        jar.set(c["name"], c["value"], domain=c.get("domain", ""), path=c.get("path", "/"))
+    try:
+        response = requests.get(PROBE_URL, cookies=jar, allow_redirects=False, timeout=timeout,
+                                headers={"User-Agent": "Mozilla/5.0"})
+    except requests.RequestException as e:
+        print(f"⚠️ Session probe failed: {e}")
+        return None
+    location = response.headers.get("Location", "")
+    if response.is_redirect and any(marker in location for marker in LOGIN_MARKERS):
+        return False
+    return response.status_code < 400
+
+
+# -----------------------------
+# Cached validator
+# -----------------------------
+class SessionValidator:
+    """Decide whether a saved login is still usable without launching a browser.
+
+    Expired or missing auth cookies fail immediately; otherwise a single
+    HTTP probe confirms the session server-side. Verdicts are cached per
+    user for `ttl` seconds (never past the earliest cookie expiry). If the
+    probe can't reach YouTube, the cookie-expiry verdict is returned but not
+    cached, so the next check probes again.
+    """
+
+    def __init__(self, ttl=SESSION_CHECK_TTL):
+        self.ttl = ttl
+        self._cache = {}  # key -> (valid, valid_until)
+        self._lock = threading.Lock()
+
+    def invalidate(self, key):
+        with self._lock:
+            self._cache.pop(key, None)
+
+    def is_valid(self, key, *files, force=False):
+        """Check the first of `files` (storage state or cookie file) that holds any cookies"""
+        now = time.time()
+        with self._lock:
+            cached = self._cache.get(key)
+        if cached and not force and now < cached[1]:
+            return cached[0]
+
+        cookies = next((c for c in (load_cookies(f) for f in files) if c), [])
+        status, earliest = cookie_expiry(cookies, now)
+        if status != "ok":
+            print(f"🔑 Session for {key}: auth cookies {status}")
+            valid = False
+        else:
+            valid = probe_session(cookies)
+            if valid is None:
+                print(f"🔑 Session for {key}: probe inconclusive, going by cookie expiry (not cached)")
+                return True
+            print(f"🔑 Session for {key}: {'valid' if valid else 'signed out'}")
+
+        valid_until = now + self.ttl
+        if valid and earliest is not None:
+            valid_until = min(valid_until, earliest - EXPIRY_MARGIN)
+        with self._lock:
+            self._cache[key] = (valid, valid_until)
+        return valid
+
+    async def ais_valid(self, key, *files, force=False):
+        """Async form for event-loop callers; the probe runs on a worker thread"""
+        return await asyncio.to_thread(self.is_valid, key, *files, force=force)
+
+
+validator = SessionValidator()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Check whether saved YouTube cookies are still signed in")
+    parser.add_argument("files", nargs="+", help="Cookie or storage-state JSON files")
+    args = parser.parse_args()
+
+    print("✅ Valid" if validator.is_valid("cli", *args.files) else "❌ Re-login needed")
@@ -0,0 +1,112 @@
+import os
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+
+# -----------------------------
+# Subtitle style
+# -----------------------------
+# Bold white caption with black stroke on a half-transparent box
+SUBTITLE_STYLE = {
+    "font": os.getenv("SUBTITLE_FONT", "arialbd.ttf"),
+    "fontsize": 42,
+    "color": (255, 255, 255, 255),
+    "stroke_color": (0, 0, 0, 255),
+    "stroke_width": 2,
+    "bg_color": (0, 0, 0, 128),
+    "width": 1000,
+    "padding": 8,
+    "line_spacing": 6,
+}
+
+FONT_FALLBACKS = ["arialbd.ttf", "Arial Bold.ttf", "Arial-Bold.ttf", "DejaVuSans-Bold.ttf", "LiberationSans-Bold.ttf"]
+
+
+@lru_cache(maxsize=16)
+def load_font(font, size):
+    for name in [font] + FONT_FALLBACKS:
+        try:
+            return ImageFont.truetype(name, size)
+        except OSError:
+            continue
+    print(f"⚠️ Font {font} not found, using Pillow default font")
+    return ImageFont.load_default(size)
+
+
+def wrap_text(text, font, max_width, stroke_width=0):
+    """Greedy word wrap so each line fits in `max_width` pixels"""
+    lines = []
+    line = ""
+    for word in text.split():
+        candidate = f"{line} {word}".strip()
+        if not line or font.getlength(candidate) + 2 * stroke_width <= max_width:
+            line = candidate
+        else:
+            lines.append(line)
+            line = word
+    if line:
+        lines.append(line)
+    return lines
+
+
+def style_for_canvas(size):
+    """Scale the caption box and font from the 1280x720 reference layout to `size`"""
+    scale = size[0] / 1280
+    return {
+        "width": round(SUBTITLE_STYLE["width"] * scale),
+        "fontsize": max(12, round(SUBTITLE_STYLE["fontsize"] * scale)),
+        "stroke_width": max(1, round(SUBTITLE_STYLE["stroke_width"] * scale)),
+    }
+
+
+def subtitle_y(size):
+    """Top edge of the caption box (550px on a 720px-high canvas)"""
+    return round(550 * size[1] / 720)
+
+
+# -----------------------------
+# Rendering
+# -----------------------------
+def _style_key(style):
+    merged = dict(SUBTITLE_STYLE, **(style or {}))
+    return tuple(sorted(merged.items()))
+
+
+@lru_cache(maxsize=int(os.getenv("SUBTITLE_CACHE_SIZE", "256")))
+def _render(text, style_key):
+    style = dict(style_key)
+    font = load_font(style["font"], style["fontsize"])
+    width = style["width"]
+    pad = style["padding"]
+    stroke = style["stroke_width"]
+
+    lines = wrap_text(text, font, width - 2 * pad, stroke) or [""]
+    ascent, descent = font.getmetrics()
+    line_height = ascent + descent + 2 * stroke
+    height = len(lines) * line_height + (len(lines) - 1) * style["line_spacing"] + 2 * pad
+
+    img = Image.new("RGBA", (width, height), style["bg_color"])
+    draw = ImageDraw.Draw(img)
+    y = pad
+    for line in lines:
+        x = (width - font.getlength(line)) / 2
+        draw.text((x, y + stroke), line, font=font, fill=style["color"],
+                  stroke_width=stroke, stroke_fill=style["stroke_color"])
+        y += line_height + style["line_spacing"]
+    return np.asarray(img)
+
+
+def render_subtitle(text, style=None):
+    """Rasterize one caption to an RGBA array (height, width, 4), cached by (text, style, size)"""
+    return _render(text, _style_key(style))
+
+
+def render_subtitles(texts, style=None, max_workers=4):
+    """Rasterize several captions in parallel, preserving order"""
+    if not texts:
+        return []
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(texts))) as executor:
+        return list(executor.map(lambda t: render_subtitle(t, style), texts))
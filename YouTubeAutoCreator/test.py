@@ -1,12 +1,17 @@
+import os
 import asyncio
 import json
 from pathlib import Path
 from typing import Optional
 from playwright.async_api import async_playwright
+from upload_session import UploaderSession, upload_many
+from upload_waits import watch_upload_response, wait_for_upload_complete, click_next_steps, click_when_enabled, wait_for_published
 
 COOKIE_FILE = Path("youtube_cookies.json")
 USER_DATA_DIR = str(Path("chrome_user_data").absolute())
 OUTPUT_DIR = Path("output")
+# Same knob as youtube_batch_upload (point at a mock page for testing); this flow starts on the Studio home page
+UPLOAD_URL = os.getenv("YOUTUBE_UPLOAD_URL", "https://studio.youtube.com")
 
 async def youtube_login(email: Optional[str] = None, password: Optional[str] = None) -> bool:
     async with async_playwright() as p:
@@ -48,8 +53,41 @@ async def youtube_login(email: Optional[str] = None, password: Optional[str] = N
         finally:
             await browser.close()
 
-async def upload_video(file_path: str, title: str, description: str = "", tags=None):
+async def upload_on_page(page, file_path: str, title: str, description: str = "", tags=None):
+    """Studio upload flow on an already-open page; raises on failure"""
     tags = tags or []
+    # Open YouTube Studio
+    await page.goto(UPLOAD_URL, wait_until="networkidle")
+    await page.wait_for_selector('tp-yt-paper-icon-button[aria-label="Create"]', timeout=60000)
+    await page.click('tp-yt-paper-icon-button[aria-label="Create"]')
+
+    # Click "Upload videos"
+    await page.click('tp-yt-paper-item:has-text("Upload videos")', timeout=30000)
+
+    # Upload file
+    file_input = await page.wait_for_selector('input[type="file"]', state="attached", timeout=30000)
+    upload_response = watch_upload_response(page)
+    await file_input.set_input_files(file_path)
+
+    # Fill title and description
+    await page.wait_for_selector('input#title-textbox', timeout=30000)
+    await page.fill('input#title-textbox', title)
+    await page.fill('textarea#description-textarea', description)
+
+    if tags:
+        await page.click('tp-yt-paper-button[aria-label="Show more"]', timeout=5000)
+        await page.fill('input#text-input', ','.join(tags))
+
+    # Next 3 times
+    await click_next_steps(page, 'ytcp-button:has-text("Next")')
+
+    # Publish once the file is fully uploaded
+    await wait_for_upload_complete(page, upload_response)
+    await click_when_enabled(page, 'ytcp-button:has-text("Publish")')
+    await wait_for_published(page)
+    print(f"✅ Video uploaded: {file_path}")
+
+async def upload_video(file_path: str, title: str, description: str = "", tags=None):
     async with async_playwright() as p:
         browser = await p.chromium.launch_persistent_context(
             user_data_dir=USER_DATA_DIR,
@@ -58,39 +96,7 @@ async def upload_video(file_path: str, title: str, description: str = "", tags=N
         )
         page = await browser.new_page()
         try:
-            # Open YouTube Studio
-            await page.goto("https://studio.youtube.com", wait_until="networkidle")
-            await page.wait_for_selector('tp-yt-paper-icon-button[aria-label="Create"]', timeout=60000)
-            await page.click('tp-yt-paper-icon-button[aria-label="Create"]')
-
-            # Click "Upload videos"
-            await page.click('tp-yt-paper-item:has-text("Upload videos")', timeout=30000)
-
-            # Upload file
-            file_input = await page.query_selector('input[type="file"]')
-            await file_input.set_input_files(file_path)
-
-            # Fill title and description
-            await page.wait_for_selector('input#title-textbox', timeout=30000)
-            await page.fill('input#title-textbox', title)
-            await page.fill('textarea#description-textarea', description)
-
-            if tags:
-                await page.click('tp-yt-paper-button[aria-label="Show more"]', timeout=5000)
-                await page.fill('input#text-input', ','.join(tags))
-
-            # Next 3 times
-            for _ in range(3):
-                await page.wait_for_selector('ytcp-button:has-text("Next")', timeout=15000)
-                await page.click('ytcp-button:has-text("Next")')
-                await asyncio.sleep(2)
-
-            # Publish
-            await page.wait_for_selector('ytcp-button:has-text("Publish")', timeout=15000)
-            await page.click('ytcp-button:has-text("Publish")')
-            await asyncio.sleep(5)
-            print(f"✅ Video uploaded: {file_path}")
-
+            await upload_on_page(page, file_path, title, description, tags)
         except Exception as e:
             print(f"❌ Upload failed: {e}")
         finally:
@@ -121,9 +127,9 @@ async def create_post(text: str, link: Optional[str] = None):
             if link:
                 await page.fill('input[type="url"]', link)
 
-            # Click Post button
-            await page.click('ytcp-button:has-text("Post")')
-            await asyncio.sleep(3)
+            # Click Post button, then wait for the dialog to close
+            await click_when_enabled(page, 'ytcp-button:has-text("Post")', timeout=15000)
+            await page.wait_for_selector('tp-yt-paper-dialog', state="detached", timeout=30000)
             print("✅ Post created successfully!")
 
         except Exception as e:
@@ -131,7 +137,7 @@ async def create_post(text: str, link: Optional[str] = None):
         finally:
             await browser.close()
 
-async def upload_all_videos():
+async def upload_all_videos(concurrency: int = 1, retries: int = 2):
     if not OUTPUT_DIR.exists():
         print("⚠️ Output directory does not exist")
         return
@@ -141,13 +147,13 @@ async def upload_all_videos():
         print("⚠️ No videos found in output folder")
         return
 
-    for video in video_files:
-        await upload_video(
-            str(video),
-            title=video.stem,
-            description=f"Automated upload of {video.stem}",
-            tags=["AI", "Automation"]
-        )
+    titles = {video: video.stem.split("__")[0] for video in video_files}  # drop the "__<profile>_src<n>" suffix
+    jobs = [
+        (str(video), titles[video], f"Automated upload of {titles[video]}", ["AI", "Automation"])
+        for video in video_files
+    ]
+    async with UploaderSession(Path(USER_DATA_DIR)) as session:
+        return await upload_many(session, jobs, upload_on_page, concurrency=concurrency, retries=retries)
 
 if __name__ == "__main__":
     import argparse
@@ -155,6 +161,7 @@ if __name__ == "__main__":
     parser.add_argument("--email", help="Google email")
     parser.add_argument("--password", help="Google password")
     parser.add_argument("--post", help="Create a YouTube post with text")
+    parser.add_argument("--concurrency", type=int, default=1, help="Parallel upload pages")
     args = parser.parse_args()
 
     if not COOKIE_FILE.exists():
@@ -164,7 +171,7 @@ if __name__ == "__main__":
             exit(1)
 
     # Upload videos
-    asyncio.run(upload_all_videos())
+    asyncio.run(upload_all_videos(concurrency=args.concurrency))
 
     # Create post if argument provided
     if args.post:
@@ -0,0 +1,92 @@
+import sys
+import json
+import threading
+from pathlib import Path
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import pytest
+
+# The modules are flat scripts in YouTubeAutoCreator/, imported by name
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+# -----------------------------
+# Local stub HTTP server
+# -----------------------------
+class StubServer:
+    """Threaded local stand-in: `handler(request)` returns (status, headers, body) for every request.
+
+    `request` is {"method", "path", "headers" (lower-case names), "body"}; a
+    dict/list body is sent as JSON. Every request is recorded in `requests`.
+    """
+
+    def __init__(self, handler):
+        self.handler = handler
+        self.requests = []
+        self.lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _serve(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                request = {
+                    "method": self.command,
+                    "path": self.path,
+                    "headers": {k.lower(): v for k, v in self.headers.items()},
+                    "body": self.rfile.read(length) if length else b"",
+                }
+                with stub.lock:
+                    stub.requests.append(request)
+                status, headers, body = stub.handler(request)
+                if isinstance(body, (dict, list)):
+                    body = json.dumps(body).encode("utf-8")
+                    headers = {"Content-Type": "application/json", **headers}
+                elif isinstance(body, str):
+                    body = body.encode("utf-8")
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            do_GET = do_POST = do_PUT = _serve
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub_server():
+    servers = []
+
+    def start(handler):
+        server = StubServer(handler)
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.close()
+
+
+@pytest.fixture(autouse=True)
+def workdir(tmp_path, monkeypatch):
+    """Each test runs in its own directory with fresh caches (the modules use relative paths)"""
+    import media_cache
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(media_cache, "_shared_caches", {})
+    for name in ("IMAGE", "TTS", "RENDER", "SCRIPT"):
+        monkeypatch.setenv(f"{name}_CACHE_DIR", str(tmp_path / f"{name.lower()}_cache"))
+    return tmp_path
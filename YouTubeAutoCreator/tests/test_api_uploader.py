@@ -0,0 +1,113 @@
+import os
+import re
+
+import pytest
+
+import youtube_api_uploader
+from youtube_api_uploader import ResumableUploader, UploadError
+
+CHUNK = 256 * 1024
+
+
+class ResumableStandIn:
+    """Minimal resumable-upload endpoint: one session, 308 + Range until the last byte arrives"""
+
+    def __init__(self, total, fail_chunks=(), reject_chunks=(), fail_queries=0):
+        self.total = total
+        self.received = bytearray()
+        self.fail_chunks = set(fail_chunks)  # chunk numbers answered once with 503
+        self.reject_chunks = set(reject_chunks)  # chunk numbers answered with 400 (client gives up)
+        self.fail_queries = fail_queries  # status queries answered with 503 before a real answer
+        self.chunks = 0
+        self.sessions = 0
+
+    def __call__(self, request):
+        if request["method"] == "POST":
+            self.sessions += 1
+            assert "uploadType=resumable" in request["path"]
+            assert request["headers"]["x-upload-content-length"] == str(self.total)
+            return 200, {"Location": f"http://{request['headers']['host']}/session/1"}, b""
+
+        content_range = request["headers"]["content-range"]
+        if content_range.startswith("bytes */"):
+            if self.fail_queries:
+                self.fail_queries -= 1
+                return 503, {}, b""
+            return self._progress()
+
+        self.chunks += 1
+        if self.chunks in self.reject_chunks:
+            return 400, {}, {"error": "rejected"}
+        if self.chunks in self.fail_chunks:
+            self.fail_chunks.discard(self.chunks)
+            return 503, {}, b""
+        start = int(re.match(r"bytes (\d+)-", content_range).group(1))
+        assert start == len(self.received)
+        self.received += request["body"]
+        return self._progress()
+
+    def _progress(self):
+        if len(self.received) == self.total:
+            return 200, {}, {"id": "vid123"}
+        headers = {"Range": f"bytes=0-{len(self.received) - 1}"} if self.received else {}
+        return 308, headers, b""
+
+
+@pytest.fixture
+def video(tmp_path):
+    path = tmp_path / "clip.mp4"
+    path.write_bytes(os.urandom(CHUNK * 3 + 1000))
+    return path
+
+
+@pytest.fixture
+def api(stub_server, monkeypatch, tmp_path):
+    def start(stand_in):
+        server = stub_server(stand_in)
+        monkeypatch.setattr(youtube_api_uploader, "API_BASE", server.url)
+        monkeypatch.setattr(youtube_api_uploader, "SESSION_STATE_DIR", tmp_path / "resumable")
+        monkeypatch.setattr(youtube_api_uploader.time, "sleep", lambda seconds: None)
+        monkeypatch.setenv("YOUTUBE_ACCESS_TOKEN", "test-token")
+        return server
+    return start
+
+
+def test_streams_file_in_chunks_and_recovers_from_server_error(api, video):
+    stand_in = ResumableStandIn(video.stat().st_size, fail_chunks={2})
+    server = api(stand_in)
+
+    url = ResumableUploader(chunk_size=CHUNK).upload(video, "Title", "Description", ["tag"])
+
+    assert url == "https://youtu.be/vid123"
+    assert bytes(stand_in.received) == video.read_bytes()
+    assert all(len(r["body"]) <= CHUNK for r in server.requests)
+    assert all(r["headers"]["authorization"] == "Bearer test-token" for r in server.requests)
+    assert not any((youtube_api_uploader.SESSION_STATE_DIR).iterdir())
+
+
+def test_failed_status_query_is_retried(api, video):
+    stand_in = ResumableStandIn(video.stat().st_size, fail_chunks={2}, fail_queries=2)
+    api(stand_in)
+
+    url = ResumableUploader(chunk_size=CHUNK).upload(video, "Title")
+
+    assert url == "https://youtu.be/vid123"
+    assert stand_in.fail_queries == 0
+    assert bytes(stand_in.received) == video.read_bytes()
+
+
+def test_resumes_saved_session_after_interruption(api, video):
+    stand_in = ResumableStandIn(video.stat().st_size, reject_chunks={3})
+    api(stand_in)
+
+    with pytest.raises(UploadError):
+        ResumableUploader(chunk_size=CHUNK).upload(video, "Title")
+    assert len(stand_in.received) == 2 * CHUNK
+
+    # A new uploader (e.g. after a restart) picks the saved session up where the server left off
+    stand_in.reject_chunks.clear()
+    url = ResumableUploader(chunk_size=CHUNK).upload(video, "Title")
+
+    assert url == "https://youtu.be/vid123"
+    assert stand_in.sessions == 1
+    assert bytes(stand_in.received) == video.read_bytes()
@@ -0,0 +1,163 @@
+import time
+import asyncio
+
+import pytest
+
+import test as studio
+import upload_session
+import youtube_batch_upload
+from upload_session import UploaderSession, upload_many
+
+UPLOAD_SECONDS = 1.5  # how long the mock page "uploads" each file
+
+# Just enough of the Studio upload dialog for youtube_batch_upload.upload_on_page (which opens the
+# upload page directly) and test.upload_on_page (which starts from Create → Upload videos)
+MOCK_STUDIO = """<!doctype html>
+<html><body>
+<tp-yt-paper-icon-button aria-label="Create" onclick="menu.hidden = false">Create</tp-yt-paper-icon-button>
+<div id="menu" hidden>
+  <tp-yt-paper-item onclick="dialog.hidden = false">Upload videos</tp-yt-paper-item>
+</div>
+<div id="dialog" hidden>
+  <input type="file" id="file">
+  <div id="details" hidden>
+    <input id="title-textbox" aria-label="Add a title that describes your video">
+    <textarea id="description-textarea" aria-label="Tell viewers about your video"></textarea>
+    <label><input type="radio" name="kids" aria-label="No, it's not 'Made for Kids'"> Not for kids</label>
+    <label><input type="radio" name="visibility" aria-label="Public"> Public</label>
+    <div class="progress-label" id="progress">Uploading 0%</div>
+    <span class="video-url-fadeable"><a id="link" href="">link</a></span>
+    <div id="step-title">Details</div>
+    <ytcp-button id="next-button" onclick="nextStep()">Next</ytcp-button>
+    <ytcp-button id="done-button" aria-disabled="true" onclick="publish()">Publish</ytcp-button>
+  </div>
+</div>
+<script>
+  const steps = ["Details", "Video elements", "Checks", "Visibility"];
+  let step = 0;
+  file.onchange = () => {
+    dialog.hidden = false;
+    details.hidden = false;
+    document.getElementById("link").href = "https://youtu.be/" + file.files[0].name.replace(".mp4", "");
+    setTimeout(() => {
+      progress.textContent = "Upload complete";
+      document.getElementById("done-button").setAttribute("aria-disabled", "false");
+    }, %UPLOAD_MS%);
+  };
+  function nextStep() {
+    step = Math.min(step + 1, steps.length - 1);
+    document.getElementById("step-title").textContent = steps[step];
+  }
+  function publish() {
+    if (document.getElementById("done-button").getAttribute("aria-disabled") === "true") return;
+    document.body.appendChild(document.createElement("ytcp-video-share-dialog"));
+  }
+</script>
+</body></html>
+""".replace("%UPLOAD_MS%", str(int(UPLOAD_SECONDS * 1000)))
+
+
+class FakeSession:
+    """UploaderSession stand-in: run(fn, *args) awaits fn(page, *args) with no browser"""
+
+    def __init__(self):
+        self.active = 0
+        self.max_active = 0
+
+    async def run(self, fn, *args):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            return await fn(None, *args)
+        finally:
+            self.active -= 1
+
+
+def test_upload_many_bounds_concurrency_and_retries():
+    attempts = {}
+
+    async def fake_upload(page, path, title):
+        attempts[path] = attempts.get(path, 0) + 1
+        await asyncio.sleep(0.2)
+        if path == "flaky.mp4" and attempts[path] == 1:
+            raise RuntimeError("transient")
+        return f"https://youtu.be/{title}"
+
+    session = FakeSession()
+    jobs = [(f"v{n}.mp4", f"v{n}") for n in range(5)] + [("flaky.mp4", "flaky")]
+    results = asyncio.run(upload_many(session, jobs, fake_upload, concurrency=3, retries=1, retry_delay=0))
+
+    assert session.max_active == 3
+    assert all(r["status"] == "done" for r in results)
+    assert [r for r in results if r["job"][0] == "flaky.mp4"][0]["attempts"] == 2
+
+
+def test_concurrent_restarts_relaunch_once(tmp_path):
+    class FakeContext:
+        def __init__(self):
+            self.closed = False
+
+        async def new_page(self):
+            await asyncio.sleep(0)
+            return object()
+
+        async def close(self):
+            self.closed = True
+
+    contexts = []
+
+    async def fake_start():
+        await asyncio.sleep(0.05)  # launching takes a while, so the callers overlap
+        session.context = FakeContext()
+        contexts.append(session.context)
+        session._alive = True
+        session.launches += 1
+
+    async def run():
+        await session.start()
+        session._alive = False  # the context crashed under three in-flight uploads
+        await asyncio.gather(*(session.new_page() for _ in range(3)))
+
+    session = UploaderSession(tmp_path / "profile", headless=True)
+    session.start = fake_start
+    asyncio.run(run())
+
+    assert session.launches == 2
+    assert contexts[0].closed and not contexts[1].closed
+
+
+@pytest.mark.parametrize("flow", ["batch", "studio"])
+def test_uploads_run_in_parallel_against_mock_page(flow, stub_server, monkeypatch, tmp_path):
+    server = stub_server(lambda request: (200, {"Content-Type": "text/html"}, MOCK_STUDIO))
+    monkeypatch.setattr(youtube_batch_upload, "UPLOAD_URL", f"{server.url}/")
+    monkeypatch.setattr(studio, "UPLOAD_URL", f"{server.url}/")
+    monkeypatch.setattr(upload_session, "BROWSER_CHANNEL", None)  # bundled Chromium
+    upload_fn = youtube_batch_upload.upload_on_page if flow == "batch" else studio.upload_on_page
+
+    videos = []
+    for n in range(3):
+        path = tmp_path / f"video_{n}.mp4"
+        path.write_bytes(b"\x00" * 1024)
+        videos.append(path)
+    jobs = [(str(path), path.stem, "description") for path in videos]
+
+    async def run():
+        session = UploaderSession(tmp_path / "profile", headless=True)
+        try:
+            await session.start()
+        except Exception as e:
+            pytest.skip(f"Chromium not available: {e}")
+        try:
+            started = time.perf_counter()
+            results = await upload_many(session, jobs, upload_fn, concurrency=3, retries=0)
+            return results, time.perf_counter() - started
+        finally:
+            await session.close()
+
+    results, elapsed = asyncio.run(run())
+
+    assert all(r["status"] == "done" for r in results), results
+    if flow == "batch":
+        assert sorted(r["result"] for r in results) == [f"https://youtu.be/video_{n}" for n in range(3)]
+    # Parallel pages: close to one upload (plus polling), well under three back to back
+    assert elapsed < UPLOAD_SECONDS * 3
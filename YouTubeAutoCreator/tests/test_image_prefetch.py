@@ -0,0 +1,90 @@
+import io
+import time
+import functools
+
+from PIL import Image
+
+import main
+
+DELAY = 0.5  # seconds the stub takes per image
+
+
+def jpeg_bytes():
+    buf = io.BytesIO()
+    Image.new("RGB", (16, 16), "red").save(buf, "JPEG")
+    return buf.getvalue()
+
+
+def start_pollinations(stub_server, monkeypatch, delay=DELAY):
+    image = jpeg_bytes()
+
+    def handler(request):
+        time.sleep(delay)
+        return 200, {"Content-Type": "image/jpeg"}, image
+
+    server = stub_server(handler)
+    monkeypatch.setattr(main, "POLLINATIONS_URL", f"{server.url}/prompt/")
+    monkeypatch.setattr(main, "_network_limiter", None)
+    return server
+
+
+def test_prefetch_fetches_scene_images_concurrently(stub_server, monkeypatch):
+    server = start_pollinations(stub_server, monkeypatch)
+    scenes = [{"visuals": f"Visuals: scene {n} city skyline"} for n in range(6)]
+
+    started = time.perf_counter()
+    images = main.VideoCreator().prefetch_images(scenes, "2", size=(320, 180))
+    elapsed = time.perf_counter() - started
+
+    assert len(images) == 6
+    assert len(server.requests) == 6
+    assert all("placeholder" not in path for path in images.values())
+    assert all("width=320" in r["path"] and "height=180" in r["path"] for r in server.requests)
+    # About one round-trip of wall time, not six
+    assert elapsed < DELAY * 3
+
+
+def test_prefetch_reuses_cached_images(stub_server, monkeypatch):
+    server = start_pollinations(stub_server, monkeypatch, delay=0)
+    scenes = [{"visuals": "server rack"}, {"visuals": "server rack"}, {"visuals": "terminal window"}]
+    creator = main.VideoCreator()
+
+    first = creator.prefetch_images(scenes, "2", size=(320, 180))
+    second = creator.prefetch_images(scenes, "2", size=(320, 180))
+
+    assert len(server.requests) == 2  # duplicate prompts are fetched once, then served from the cache
+    assert first == second
+
+
+def test_corrupt_image_is_retried(stub_server, monkeypatch):
+    image = jpeg_bytes()
+    attempts = []
+
+    def handler(request):
+        attempts.append(request)
+        body = image[:20] if len(attempts) == 1 else image  # first reply is a truncated 200
+        return 200, {"Content-Type": "image/jpeg"}, body
+
+    server = stub_server(handler)
+    monkeypatch.setattr(main, "POLLINATIONS_URL", f"{server.url}/prompt/")
+    monkeypatch.setattr(main, "_network_limiter", None)
+
+    path = main.pollinations_generate_image("corrupt first", delay=0.01)
+
+    assert len(attempts) == 2
+    assert "placeholder" not in path
+
+
+def test_non_image_reply_is_never_cached(stub_server, monkeypatch, tmp_path):
+    import freepik_image
+
+    server = stub_server(lambda request: (200, {"Content-Type": "text/html"}, "<html>rate limited</html>"))
+    monkeypatch.setattr(main, "POLLINATIONS_URL", f"{server.url}/prompt/")
+    monkeypatch.setattr(main, "_network_limiter", None)
+    monkeypatch.setattr(freepik_image, "afetch_pollinations", functools.partial(main.afetch_pollinations, delay=0.01))
+
+    assert freepik_image.pollinations_generate_image("html reply", str(tmp_path / "out.jpeg"), size=(320, 180)) is False
+    # Nothing poisoned the shared cache: main's path fetches again and falls back to the placeholder
+    requests_before = len(server.requests)
+    assert "placeholder" in main.pollinations_generate_image("html reply", size=(320, 180), delay=0.01)
+    assert len(server.requests) > requests_before
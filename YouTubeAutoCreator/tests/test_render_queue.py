@@ -0,0 +1,47 @@
+import os
+import time
+import asyncio
+
+import pytest
+
+import render_jobs
+from render_jobs import RenderQueue
+
+
+def init_worker(network_limiter, render_threads):
+    pass
+
+
+def fake_render(topic, image_source_choice, render_backend, render_profile):
+    """Stands in for batch_render.render_topic; "crash" kills its worker like an OOM kill would"""
+    if topic == "crash":
+        os._exit(1)
+    time.sleep(0.2)
+    path = f"{topic.replace(' ', '_')}.mp4"
+    with open(path, "wb") as f:
+        f.write(b"video")
+    return {"output": path, "seconds": 0.2}
+
+
+def test_dead_worker_only_fails_its_job_and_pool_recovers(monkeypatch):
+    monkeypatch.setattr(render_jobs, "_init_worker", init_worker)
+    monkeypatch.setattr(render_jobs, "render_topic", fake_render)
+
+    async def run():
+        queue = RenderQueue(workers=2, max_per_user=5, network_limit=2)
+        try:
+            crashed = queue.submit(1, "crash", "2")
+            survivor = queue.submit(2, "survivor", "2")
+            with pytest.raises(RuntimeError, match="worker crashed"):
+                await crashed.future
+            assert await survivor.future == "survivor.mp4"
+
+            # The rebuilt pool keeps serving new jobs
+            later = queue.submit(1, "later", "2")
+            assert await later.future == "later.mp4"
+            assert crashed.crashes == 1
+            assert queue.stats()["queued"] == 0
+        finally:
+            await queue.close()
+
+    asyncio.run(asyncio.wait_for(run(), timeout=60))
@@ -0,0 +1,68 @@
+import time
+import threading
+
+import pytest
+
+from script_client import GeminiClient, ScriptClientError
+
+
+def reply(text):
+    return {"candidates": [{"content": {"parts": [{"text": text}]}}]}
+
+
+def test_retries_rate_limit_then_serves_from_cache(stub_server):
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        if len(calls) == 1:
+            return 429, {"Retry-After": "0"}, {}
+        return 200, {}, reply("SCRIPT")
+
+    server = stub_server(handler)
+    client = GeminiClient("test-key", base_url=server.url, backoff=0.01)
+
+    assert client.generate("docker basics") == "SCRIPT"
+    assert len(calls) == 2
+    assert calls[1]["method"] == "POST"
+    assert calls[1]["path"].endswith(":generateContent")
+    assert calls[1]["headers"]["x-goog-api-key"] == "test-key"
+
+    assert client.generate("docker basics") == "SCRIPT"  # on-disk cache, no new request
+    assert len(calls) == 2
+
+
+def test_concurrent_identical_prompts_coalesce(stub_server):
+    def handler(request):
+        time.sleep(0.5)
+        return 200, {}, reply("SHARED")
+
+    server = stub_server(handler)
+    client = GeminiClient("test-key", base_url=server.url)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(client.generate("same topic"))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == ["SHARED"] * 5
+    assert len(server.requests) == 1
+
+
+def test_client_error_is_not_retried(stub_server):
+    server = stub_server(lambda request: (400, {}, {"error": {"message": "bad request"}}))
+    client = GeminiClient("test-key", base_url=server.url, backoff=0.01)
+
+    with pytest.raises(ScriptClientError):
+        client.generate("topic", use_cache=False)
+    assert len(server.requests) == 1
+
+
+def test_gives_up_after_retries(stub_server):
+    server = stub_server(lambda request: (503, {}, {}))
+    client = GeminiClient("test-key", base_url=server.url, retries=2, backoff=0.01)
+
+    with pytest.raises(ScriptClientError):
+        client.generate("topic", use_cache=False)
+    assert len(server.requests) == 3
@@ -0,0 +1,186 @@
+import os
+import time
+import hashlib
+import sqlite3
+import threading
+from pathlib import Path
+
+UPLOAD_QUEUE_DB = Path(os.getenv("UPLOAD_QUEUE_DB", "upload_queue.db"))
+MAX_ATTEMPTS = int(os.getenv("UPLOAD_MAX_ATTEMPTS", "5"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    file_hash TEXT NOT NULL,
+    account TEXT NOT NULL,
+    path TEXT NOT NULL,
+    title TEXT NOT NULL,
+    description TEXT NOT NULL DEFAULT '',
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    video_url TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    UNIQUE (file_hash, account)
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status);
+CREATE TABLE IF NOT EXISTS file_hashes (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    file_hash TEXT NOT NULL
+);
+"""
+
+
+def file_sha256(path, chunk_size=1024 * 1024):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# -----------------------------
+# Durable upload queue
+# -----------------------------
+class UploadQueue:
+    """SQLite-backed upload jobs: pending → uploading → done | failed.
+
+    Jobs are keyed by (file content hash, account), so re-running a batch
+    skips anything already published and a renamed copy of the same video
+    is not uploaded twice. Jobs left in 'uploading' by a crashed run are
+    put back to 'pending' when the queue is opened.
+
+    Hashes are remembered by (path, size, mtime), so unchanged files are not
+    re-read. enqueue() still reads new files and writes to disk; call it with
+    asyncio.to_thread from an event loop (the connection is thread-safe).
+    """
+
+    def __init__(self, db_path=UPLOAD_QUEUE_DB, account="default"):
+        self.db_path = Path(db_path)
+        self.account = account
+        self.db = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._lock = threading.RLock()
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(SCHEMA)
+        recovered = self.db.execute(
+            "UPDATE jobs SET status = 'pending', updated_at = ? WHERE status = 'uploading' AND account = ?",
+            (time.time(), self.account)
+        ).rowcount
+        self.db.commit()
+        if recovered:
+            print(f"♻️ Resuming {recovered} interrupted upload(s)")
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def file_hash(self, path):
+        """sha256 of `path`, reusing the stored hash while its size and mtime are unchanged"""
+        stat = os.stat(path)
+        with self._lock:
+            row = self.db.execute("SELECT size, mtime, file_hash FROM file_hashes WHERE path = ?", (str(path),)).fetchone()
+        if row and row["size"] == stat.st_size and row["mtime"] == stat.st_mtime:
+            return row["file_hash"]
+        file_hash = file_sha256(path)
+        with self._lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO file_hashes (path, size, mtime, file_hash) VALUES (?, ?, ?, ?)",
+                (str(path), stat.st_size, stat.st_mtime, file_hash)
+            )
+            self.db.commit()
+        return file_hash
+
+    def enqueue(self, path, title, description=""):
+        """Add a video unless the same content is already queued or published; returns the job id or None"""
+        file_hash = self.file_hash(path)
+        with self._lock:
+            existing = self.db.execute(
+                "SELECT id, status, path FROM jobs WHERE file_hash = ? AND account = ?", (file_hash, self.account)
+            ).fetchone()
+            if existing:
+                if existing["status"] == "done":
+                    print(f"⏭️ Already published: {path}")
+                    return None
+                if existing["path"] != str(path):
+                    # Same content, moved or renamed: upload from where it is now
+                    self.db.execute("UPDATE jobs SET path = ? WHERE id = ?", (str(path), existing["id"]))
+                    self.db.commit()
+                return existing["id"]
+
+            now = time.time()
+            cursor = self.db.execute(
+                "INSERT INTO jobs (file_hash, account, path, title, description, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (file_hash, self.account, str(path), title, description, now, now)
+            )
+            self.db.commit()
+            return cursor.lastrowid
+
+    def pending(self, max_attempts=MAX_ATTEMPTS):
+        """Jobs still to upload (pending, or failed with attempts left), oldest first"""
+        return self.db.execute(
+            "SELECT * FROM jobs WHERE account = ? AND status IN ('pending', 'failed') AND attempts < ? "
+            "ORDER BY id",
+            (self.account, max_attempts)
+        ).fetchall()
+
+    def mark_uploading(self, job_id):
+        with self._lock:
+            self.db.execute(
+                "UPDATE jobs SET status = 'uploading', attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                (time.time(), job_id)
+            )
+            self.db.commit()
+
+    def mark_done(self, job_id, video_url=None):
+        with self._lock:
+            self.db.execute(
+                "UPDATE jobs SET status = 'done', video_url = ?, error = NULL, updated_at = ? WHERE id = ?",
+                (video_url, time.time(), job_id)
+            )
+            self.db.commit()
+
+    def mark_failed(self, job_id, error):
+        with self._lock:
+            self.db.execute(
+                "UPDATE jobs SET status = 'failed', error = ?, updated_at = ? WHERE id = ?",
+                (str(error)[:500], time.time(), job_id)
+            )
+            self.db.commit()
+
+    def stats(self):
+        counts = {"pending": 0, "uploading": 0, "done": 0, "failed": 0}
+        for row in self.db.execute(
+            "SELECT status, COUNT(*) AS n FROM jobs WHERE account = ? GROUP BY status", (self.account,)
+        ):
+            counts[row["status"]] = row["n"]
+        counts["total"] = sum(counts.values())
+        return counts
+
+    def print_stats(self):
+        s = self.stats()
+        print(f"📋 Upload queue [{self.account}]: {s['done']} published, {s['pending']} pending, "
+              f"{s['failed']} failed, {s['uploading']} uploading ({s['total']} total)")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Inspect the upload queue")
+    parser.add_argument("--db", default=str(UPLOAD_QUEUE_DB), help="Queue database path")
+    parser.add_argument("--account", default="default", help="Account (storage file name) to show")
+    args = parser.parse_args()
+
+    with UploadQueue(args.db, args.account) as queue:
+        queue.print_stats()
+        for row in queue.db.execute("SELECT * FROM jobs WHERE account = ? ORDER BY id", (args.account,)):
+            print(f"  #{row['id']:<4} {row['status']:<9} x{row['attempts']} {row['title']} {row['video_url'] or ''}")
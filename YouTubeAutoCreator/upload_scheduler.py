@@ -0,0 +1,74 @@
+import os
+import time
+import asyncio
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+UPLOAD_MAX_BROWSERS = int(os.getenv("UPLOAD_MAX_BROWSERS", "3"))  # upload browsers open at once, all accounts
+SLOW_WAIT_SECONDS = 1.0  # waits longer than this are logged
+
+
+# -----------------------------
+# Per-account upload scheduling
+# -----------------------------
+class UploadScheduler:
+    """Serialise uploads per account (storage state), run different accounts in parallel.
+
+    `slot(account)` first takes that account's lock, then one of
+    `max_browsers` global browser slots, and records how long each wait took.
+
+        async with upload_scheduler.slot(storage_file):
+            await batch_upload(storage_file=storage_file)
+    """
+
+    def __init__(self, max_browsers: int = UPLOAD_MAX_BROWSERS):
+        self.max_browsers = max_browsers
+        self._browsers = asyncio.Semaphore(max_browsers)
+        self._locks = {}
+        self._waits = {"account": [], "browser": []}
+        self.running = 0
+
+    @staticmethod
+    def account_key(account):
+        return str(Path(account).resolve()) if account else "default"
+
+    def _record(self, kind, account, seconds):
+        samples = self._waits[kind]
+        samples.append(seconds)
+        del samples[:-500]  # keep a rolling window
+        if seconds > SLOW_WAIT_SECONDS:
+            print(f"⏱️ Upload for {Path(account).stem if account != 'default' else account} "
+                  f"waited {seconds:.1f}s for {'its account lock' if kind == 'account' else 'a browser slot'}")
+
+    @asynccontextmanager
+    async def slot(self, account=None):
+        key = self.account_key(account)
+        lock = self._locks.setdefault(key, asyncio.Lock())
+
+        started = time.perf_counter()
+        async with lock:
+            locked = time.perf_counter()
+            self._record("account", key, locked - started)
+            async with self._browsers:
+                self._record("browser", key, time.perf_counter() - locked)
+                self.running += 1
+                try:
+                    yield
+                finally:
+                    self.running -= 1
+
+    def is_busy(self, account=None) -> bool:
+        lock = self._locks.get(self.account_key(account))
+        return bool(lock and lock.locked())
+
+    def metrics(self):
+        """{"running", "max_browsers", "<kind>_wait_avg"/"_max"/"_count"} over the rolling window"""
+        stats = {"running": self.running, "max_browsers": self.max_browsers}
+        for kind, samples in self._waits.items():
+            stats[f"{kind}_wait_count"] = len(samples)
+            stats[f"{kind}_wait_avg"] = round(sum(samples) / len(samples), 2) if samples else 0.0
+            stats[f"{kind}_wait_max"] = round(max(samples), 2) if samples else 0.0
+        return stats
+
+
+upload_scheduler = UploadScheduler()
@@ -0,0 +1,173 @@
+import os
+import time
+import asyncio
+from pathlib import Path
+from typing import Optional
+
+from playwright.async_api import async_playwright, BrowserContext, Page, Error as PlaywrightError
+
+USER_DATA_DIR = Path("chrome_user_data")  # Persistent profile with saved login
+BROWSER_ARGS = ["--start-maximized", "--disable-blink-features=AutomationControlled", "--disable-infobars"]
+BROWSER_CHANNEL = os.getenv("UPLOAD_BROWSER_CHANNEL", "chrome") or None  # empty = bundled Chromium
+
+
+# -----------------------------
+# Reusable uploader browser session
+# -----------------------------
+class UploaderSession:
+    """Launch Chrome once for a whole upload batch and open a fresh page per video.
+
+    Uses the persistent `chrome_user_data` profile by default, or a
+    Playwright storage-state file when `storage_file` is given. If the
+    browser or context dies mid-batch, the next `new_page()` / `run()`
+    relaunches it transparently.
+
+        async with UploaderSession() as session:
+            for video in videos:
+                await session.run(upload_on_page, str(video), title, description)
+    """
+
+    def __init__(self, user_data_dir: Path = USER_DATA_DIR, storage_file: Optional[Path] = None, headless: bool = False):
+        self.user_data_dir = Path(user_data_dir)
+        self.storage_file = Path(storage_file) if storage_file else None
+        self.headless = headless
+        self._playwright = None
+        self._browser = None
+        self.context: Optional[BrowserContext] = None
+        self._alive = False
+        self.launches = 0
+        self._restart_lock = asyncio.Lock()
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def start(self):
+        if self._playwright is None:
+            self._playwright = await async_playwright().start()
+        chromium = self._playwright.chromium
+        if self.storage_file:
+            self._browser = await chromium.launch(channel=BROWSER_CHANNEL, headless=self.headless, args=BROWSER_ARGS)
+            browser = self._browser
+            browser.on("disconnected", lambda _: self._mark_dead(browser))
+            self.context = await browser.new_context(storage_state=str(self.storage_file), no_viewport=True)
+        else:
+            self.context = await chromium.launch_persistent_context(
+                user_data_dir=str(self.user_data_dir.absolute()),
+                channel=BROWSER_CHANNEL,
+                headless=self.headless,
+                args=BROWSER_ARGS
+            )
+        context = self.context
+        context.on("close", lambda _: self._mark_dead(context))
+        self._alive = True
+        self.launches += 1
+        print(f"🌐 Uploader browser launched (#{self.launches})")
+
+    def _mark_dead(self, source):
+        # Ignore late close events from a context/browser that has already been replaced
+        if source is self.context or source is self._browser:
+            self._alive = False
+
+    async def _discard(self):
+        for closable in (self.context, self._browser):
+            if closable is None:
+                continue
+            try:
+                await closable.close()
+            except Exception:
+                pass
+        self.context = None
+        self._browser = None
+        self._alive = False
+
+    async def restart(self, generation=None):
+        """Relaunch the browser. With `generation` (the `launches` count the caller saw), only the first
+        of several concurrent callers relaunches; the rest reuse the context it started."""
+        async with self._restart_lock:
+            if generation is not None and generation != self.launches and self._alive:
+                return
+            print("♻️ Uploader browser context lost, relaunching...")
+            await self._discard()
+            await self.start()
+
+    async def new_page(self) -> Page:
+        generation = self.launches
+        if not self._alive or self.context is None:
+            await self.restart(generation)
+            generation = self.launches
+        try:
+            return await self.context.new_page()
+        except PlaywrightError:
+            await self.restart(generation)
+            return await self.context.new_page()
+
+    async def run(self, fn, *args, **kwargs):
+        """Call `await fn(page, *args, **kwargs)` on a fresh page; retried once if the context crashed"""
+        for attempt in range(2):
+            page = await self.new_page()
+            try:
+                return await fn(page, *args, **kwargs)
+            except PlaywrightError:
+                if self._alive or attempt == 1:
+                    raise
+                # The context died under us, not a page-level failure: relaunch and retry
+            finally:
+                if self._alive and not page.is_closed():
+                    await page.close()
+
+    async def close(self):
+        await self._discard()
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+
+# -----------------------------
+# Bounded concurrent uploads
+# -----------------------------
+async def run_with_retries(session, job, upload_fn, semaphore: asyncio.Semaphore, retries: int = 2, retry_delay: float = 10):
+    """Run `upload_fn(page, *job)` holding `semaphore`, retrying up to `retries` extra times.
+
+    Returns {"job", "status", "attempts", "seconds", "error", "result"}.
+    """
+    started = time.perf_counter()
+    error = None
+    for attempt in range(1, retries + 2):
+        async with semaphore:
+            try:
+                result = await session.run(upload_fn, *job)
+                return {"job": job, "status": "done", "attempts": attempt,
+                        "seconds": round(time.perf_counter() - started, 1), "error": None, "result": result}
+            except Exception as e:
+                error = str(e)
+                print(f"⚠️ Upload attempt {attempt} failed for {job[0]}: {e}")
+        if attempt <= retries:
+            await asyncio.sleep(retry_delay)
+    return {"job": job, "status": "failed", "attempts": retries + 1,
+            "seconds": round(time.perf_counter() - started, 1), "error": error, "result": None}
+
+
+async def upload_many(session: UploaderSession, jobs, upload_fn, concurrency: int = 3, retries: int = 2, retry_delay: float = 10):
+    """Run `upload_fn(page, *job)` for every job on up to `concurrency` pages of one session.
+
+    Each job is retried up to `retries` extra times on a fresh page.
+    Returns a summary list of {"job", "status", "attempts", "seconds", "error", "result"}.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    started = time.perf_counter()
+    results = await asyncio.gather(
+        *(run_with_retries(session, tuple(job), upload_fn, semaphore, retries, retry_delay) for job in jobs)
+    )
+    elapsed = time.perf_counter() - started
+    done = [r for r in results if r["status"] == "done"]
+    slowest = max((r["seconds"] for r in results), default=0)
+    print(f"\n📊 Uploaded {len(done)}/{len(results)} videos in {elapsed:.0f}s "
+          f"with {concurrency} parallel pages (slowest single upload {slowest:.0f}s)")
+    for r in results:
+        if r["status"] != "done":
+            print(f"   ❌ {r['job'][0]}: {r['error']}")
+    return results
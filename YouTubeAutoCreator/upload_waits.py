@@ -0,0 +1,93 @@
+import os
+import asyncio
+
+from playwright.async_api import Page, Response
+
+# Where Studio streams the file to; the last chunk's response carries X-Goog-Upload-Status: final
+UPLOAD_ENDPOINT = os.getenv("YOUTUBE_UPLOAD_ENDPOINT", "upload.youtube.com")
+UPLOAD_TIMEOUT_MS = int(os.getenv("UPLOAD_TIMEOUT_MS", str(30 * 60 * 1000)))
+STEP_TIMEOUT_MS = 60000
+
+# True once Studio's progress label has moved past "Uploading NN%"
+UPLOAD_DONE_JS = """() => {
+    const el = document.querySelector('ytcp-video-upload-progress, .progress-label');
+    const text = ((el && el.textContent) || '').toLowerCase();
+    return /upload complete|checks complete|processing|finished/.test(text) && !/uploading/.test(text);
+}"""
+
+ENABLED_JS = """(el) => !el.disabled && !el.hasAttribute('disabled') && el.getAttribute('aria-disabled') !== 'true'"""
+
+# Text of the active step in the upload dialog stepper (Details / Video elements / Checks / Visibility)
+ACTIVE_STEP_JS = """() => {
+    const step = document.querySelector('[role="tab"][aria-selected="true"], .step[active], #step-title');
+    return step ? step.textContent.trim() : null;
+}"""
+
+
+# -----------------------------
+# Shared upload waits
+# -----------------------------
+def watch_upload_response(page: Page) -> asyncio.Future:
+    """Start listening for the final upload-chunk response. Call before set_input_files."""
+    future = asyncio.get_running_loop().create_future()
+
+    def on_response(response: Response):
+        if future.done() or UPLOAD_ENDPOINT not in response.url:
+            return
+        if response.headers.get("x-goog-upload-status") == "final" and response.ok:
+            future.set_result(response.url)
+
+    page.on("response", on_response)
+    future.add_done_callback(lambda _: page.remove_listener("response", on_response))
+    return future
+
+
+async def wait_for_upload_complete(page: Page, response_watch: asyncio.Future = None, timeout: int = UPLOAD_TIMEOUT_MS):
+    """Return as soon as either the progress label reports completion or the final upload response arrives"""
+    progress = asyncio.ensure_future(page.wait_for_function(UPLOAD_DONE_JS, timeout=timeout, polling=1000))
+    waiters = [progress] + ([response_watch] if response_watch is not None else [])
+    try:
+        done, _ = await asyncio.wait(waiters, timeout=timeout / 1000, return_when=asyncio.FIRST_COMPLETED)
+        if not done:
+            raise TimeoutError(f"Upload did not complete within {timeout / 1000:.0f}s")
+        for task in done:
+            task.result()  # surface errors from the finished waiter
+        print("✅ Upload finished on YouTube's side")
+    finally:
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.cancel()
+
+
+async def wait_until_enabled(page: Page, selector: str, timeout: int = STEP_TIMEOUT_MS):
+    """Wait for `selector` to be visible and not disabled/aria-disabled; returns its element handle"""
+    handle = await page.wait_for_selector(selector, state="visible", timeout=timeout)
+    await page.wait_for_function(ENABLED_JS, arg=handle, timeout=timeout)
+    return handle
+
+
+async def click_when_enabled(page: Page, selector: str, timeout: int = STEP_TIMEOUT_MS):
+    handle = await wait_until_enabled(page, selector, timeout)
+    await handle.click()
+
+
+async def click_next_steps(page: Page, selector: str, steps: int = 3, timeout: int = STEP_TIMEOUT_MS):
+    """Click Next `steps` times, each time waiting for the button to enable and the dialog to advance"""
+    for _ in range(steps):
+        before = await page.evaluate(ACTIVE_STEP_JS)
+        await click_when_enabled(page, selector, timeout)
+        if before is not None:
+            await page.wait_for_function(
+                f"(before) => ({ACTIVE_STEP_JS})() !== before", arg=before, timeout=timeout
+            )
+
+
+async def wait_for_published(page: Page, timeout: int = STEP_TIMEOUT_MS):
+    """Wait for Studio's post-publish dialog instead of sleeping after the Publish click"""
+    try:
+        await page.wait_for_selector(
+            "ytcp-video-share-dialog, ytcp-uploads-still-processing-dialog",
+            state="attached", timeout=timeout
+        )
+    except Exception as e:
+        print(f"⚠️ Publish confirmation not seen: {e}")
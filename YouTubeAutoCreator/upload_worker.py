@@ -0,0 +1,120 @@
+import asyncio
+import threading
+from pathlib import Path
+from typing import Optional
+
+from upload_session import USER_DATA_DIR, run_with_retries
+from upload_queue import UploadQueue, UPLOAD_QUEUE_DB
+from youtube_batch_upload import UPLOAD_BACKEND, UPLOAD_CONCURRENCY, upload_backend, tracked_upload
+
+_STOP = object()
+
+
+# -----------------------------
+# Long-lived upload consumer
+# -----------------------------
+class UploadWorker:
+    """Background uploader that drains finished renders while rendering continues.
+
+    Runs its own event loop on a thread with one uploader session (browser
+    or API) for its whole lifetime. Producers call `submit()` from any
+    thread as soon as a video is written; every job goes through the
+    persistent UploadQueue, so jobs left pending by an earlier run are
+    picked up first and already-published videos are skipped.
+
+        with UploadWorker() as uploader:
+            for topic in topics:
+                uploader.submit(creator.create_video(topic, "2", upload=False), topic)
+    """
+
+    def __init__(self, backend: str = UPLOAD_BACKEND, storage_file: Optional[Path] = None,
+                 concurrency: int = UPLOAD_CONCURRENCY, retries: int = 2, queue_path: Path = UPLOAD_QUEUE_DB):
+        self.backend = backend
+        self.storage_file = storage_file
+        self.concurrency = concurrency
+        self.retries = retries
+        self.queue_path = queue_path
+        self.results = []
+        self._loop = None
+        self._jobs = None
+        self._ready = threading.Event()
+        self._thread = None
+        self._error = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run_loop, name="upload-worker", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        if self._error:
+            raise self._error
+
+    def submit(self, video_path, title: str, description: Optional[str] = None):
+        """Queue a finished video for upload (thread-safe, returns immediately)"""
+        if self._loop is None or not self._thread.is_alive():
+            raise RuntimeError("Upload worker is not running")
+        description = description or f"Automated upload for {title}"
+        self._loop.call_soon_threadsafe(self._jobs.put_nowait, (str(video_path), title, description))
+        print(f"📥 Queued for upload: {video_path}")
+
+    def close(self):
+        """Wait for every submitted upload to finish, then shut the session down; returns the results"""
+        if self._thread is None:
+            return self.results
+        if self._loop is not None and self._thread.is_alive():
+            self._loop.call_soon_threadsafe(self._jobs.put_nowait, _STOP)
+        self._thread.join()
+        self._thread = None
+        done = sum(1 for r in self.results if r["status"] == "done")
+        print(f"📊 Upload worker finished: {done}/{len(self.results)} uploaded")
+        return self.results
+
+    def _run_loop(self):
+        try:
+            asyncio.run(self._main())
+        except Exception as e:
+            self._error = e
+            print(f"❌ Upload worker stopped: {e}")
+        finally:
+            self._ready.set()
+
+    async def _main(self):
+        self._loop = asyncio.get_running_loop()
+        self._jobs = asyncio.Queue()
+        account = Path(self.storage_file).stem if self.storage_file else "default"
+        semaphore = asyncio.Semaphore(self.concurrency)
+        tasks = []
+
+        with UploadQueue(self.queue_path, account) as queue:
+            session_cls, upload_fn = upload_backend(self.backend)
+            upload_job = tracked_upload(queue, upload_fn)
+
+            async def run_job(job):
+                result = await run_with_retries(session, job, upload_job, semaphore, self.retries)
+                self.results.append(result)
+
+            async with session_cls(USER_DATA_DIR, storage_file=self.storage_file) as session:
+                self._ready.set()
+                # Leftovers from an interrupted run go first
+                for row in queue.pending():
+                    job = (row["path"], row["title"], row["description"], row["id"])
+                    tasks.append(asyncio.create_task(run_job(job), name=str(row["id"])))
+
+                while True:
+                    item = await self._jobs.get()
+                    if item is _STOP:
+                        break
+                    video_path, title, description = item
+                    job_id = await asyncio.to_thread(queue.enqueue, video_path, title, description)
+                    if job_id is None or any(not t.done() and t.get_name() == str(job_id) for t in tasks):
+                        continue
+                    tasks.append(asyncio.create_task(run_job((video_path, title, description, job_id)), name=str(job_id)))
+
+                await asyncio.gather(*tasks)
+            queue.print_stats()
@@ -0,0 +1,266 @@
+import os
+import json
+import time
+import asyncio
+import hashlib
+from pathlib import Path
+from typing import Optional, List
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# -----------------------------
+# Config
+# -----------------------------
+API_BASE = os.getenv("YOUTUBE_API_BASE", "https://www.googleapis.com")  # point at a local stand-in for testing
+TOKEN_URL = os.getenv("YOUTUBE_TOKEN_URL", "https://oauth2.googleapis.com/token")
+TOKEN_FILE = Path(os.getenv("YOUTUBE_TOKEN_FILE", "youtube_oauth.json"))  # {"client_id", "client_secret", "refresh_token"}
+SESSION_STATE_DIR = Path(os.getenv("YOUTUBE_RESUMABLE_DIR", "temp/resumable"))
+CHUNK_SIZE = int(os.getenv("YOUTUBE_CHUNK_MB", "8")) * 1024 * 1024  # must be a multiple of 256 KiB
+MAX_RETRIES = 8
+RETRY_STATUSES = {500, 502, 503, 504}
+
+
+class UploadError(Exception):
+    pass
+
+
+# -----------------------------
+# HTTP session & auth
+# -----------------------------
+def make_http_session(pool_size=10):
+    """One pooled session shared by every upload (keep-alive connections are reused across chunks and videos)"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+class TokenProvider:
+    """Access token from YOUTUBE_ACCESS_TOKEN, or refreshed from the OAuth token file"""
+
+    def __init__(self, http, token_file=TOKEN_FILE):
+        self.http = http
+        self.token_file = Path(token_file)
+        self._token = os.getenv("YOUTUBE_ACCESS_TOKEN")
+        self._expires_at = float("inf") if self._token else 0
+
+    def get(self):
+        if self._token and time.time() < self._expires_at - 60:
+            return self._token
+        if not self.token_file.exists():
+            raise UploadError(f"No YOUTUBE_ACCESS_TOKEN and no OAuth token file at {self.token_file}")
+        creds = json.loads(self.token_file.read_text(encoding="utf-8"))
+        response = self.http.post(TOKEN_URL, data={
+            "client_id": creds["client_id"],
+            "client_secret": creds["client_secret"],
+            "refresh_token": creds["refresh_token"],
+            "grant_type": "refresh_token",
+        }, timeout=30)
+        response.raise_for_status()
+        data = response.json()
+        self._token = data["access_token"]
+        self._expires_at = time.time() + data.get("expires_in", 3600)
+        return self._token
+
+
+# -----------------------------
+# Resumable upload
+# -----------------------------
+def _state_path(video_path):
+    stat = os.stat(video_path)
+    key = hashlib.sha256(f"{Path(video_path).resolve()}|{stat.st_size}|{stat.st_mtime_ns}".encode()).hexdigest()
+    return SESSION_STATE_DIR / f"{key}.json"
+
+
+def _uploaded_bytes(response):
+    """Next byte offset from a 308 response's Range header ("bytes=0-N")"""
+    range_header = response.headers.get("Range")
+    if not range_header:
+        return 0
+    return int(range_header.rsplit("-", 1)[1]) + 1
+
+
+class ResumableUploader:
+    """YouTube Data API v3 resumable uploads over one pooled HTTP session.
+
+    The file is streamed in CHUNK_SIZE pieces read straight from disk; the
+    session URI is saved under SESSION_STATE_DIR so an interrupted upload
+    (network error or process restart) continues from the last byte the
+    server acknowledged.
+    """
+
+    def __init__(self, http=None, tokens=None, chunk_size=CHUNK_SIZE):
+        self.http = http or make_http_session()
+        self.tokens = tokens or TokenProvider(self.http)
+        self.chunk_size = chunk_size
+
+    def _headers(self, extra=None):
+        headers = {"Authorization": f"Bearer {self.tokens.get()}"}
+        headers.update(extra or {})
+        return headers
+
+    def _start_session(self, video_path, title, description, tags, privacy):
+        metadata = {
+            "snippet": {"title": title[:100], "description": description, "tags": tags or [], "categoryId": "28"},
+            "status": {"privacyStatus": privacy, "selfDeclaredMadeForKids": False},
+        }
+        response = self.http.post(
+            f"{API_BASE}/upload/youtube/v3/videos",
+            params={"uploadType": "resumable", "part": "snippet,status"},
+            headers=self._headers({
+                "Content-Type": "application/json; charset=UTF-8",
+                "X-Upload-Content-Length": str(os.path.getsize(video_path)),
+                "X-Upload-Content-Type": "video/mp4",
+            }),
+            data=json.dumps(metadata),
+            timeout=60
+        )
+        response.raise_for_status()
+        return response.headers["Location"]
+
+    def _query_offset(self, session_uri, total):
+        """Ask the server how much it already has; returns (offset, finished_response_or_None)"""
+        response = self.http.put(
+            session_uri, headers=self._headers({"Content-Range": f"bytes */{total}", "Content-Length": "0"}), timeout=60
+        )
+        if response.status_code in (200, 201):
+            return total, response
+        if response.status_code == 308:
+            return _uploaded_bytes(response), None
+        if response.status_code == 404:
+            raise UploadError("Upload session expired")
+        response.raise_for_status()
+        return 0, None
+
+    def _recover(self, video_path, session_uri, total, offset, retries, reason):
+        """Back off, then ask where to resume; a failed status query counts as one more retry.
+
+        Returns (offset, finished_response_or_None, retries).
+        """
+        while True:
+            retries += 1
+            if retries > MAX_RETRIES:
+                raise UploadError(f"Giving up on {video_path} after {MAX_RETRIES} retries: {reason}")
+            wait = min(2 ** retries, 60)
+            print(f"⚠️ Chunk at {offset} failed ({reason}), resuming in {wait}s")
+            time.sleep(wait)
+            try:
+                offset, done = self._query_offset(session_uri, total)
+                return offset, done, retries
+            except requests.RequestException as e:
+                status = e.response.status_code if e.response is not None else None
+                if status is not None and status not in RETRY_STATUSES:
+                    raise UploadError(f"Upload status query failed with HTTP {status}") from e
+                reason = f"status query: {status or e}"
+
+    def upload(self, video_path, title, description="", tags=None, privacy="public"):
+        """Upload `video_path`, returns the video URL"""
+        video_path = str(video_path)
+        total = os.path.getsize(video_path)
+        state_path = _state_path(video_path)
+        SESSION_STATE_DIR.mkdir(parents=True, exist_ok=True)
+
+        session_uri = None
+        if state_path.exists():
+            session_uri = json.loads(state_path.read_text(encoding="utf-8")).get("session_uri")
+        offset, done = 0, None
+        if session_uri:
+            try:
+                offset, done = self._query_offset(session_uri, total)
+                print(f"♻️ Resuming {Path(video_path).name} at {offset}/{total} bytes")
+            except (UploadError, requests.RequestException):
+                session_uri = None
+        if not session_uri:
+            session_uri = self._start_session(video_path, title, description, tags, privacy)
+            state_path.write_text(json.dumps({"session_uri": session_uri}), encoding="utf-8")
+
+        started = time.perf_counter()
+        retries = 0
+        with open(video_path, "rb") as f:
+            while done is None:
+                f.seek(offset)
+                chunk = f.read(self.chunk_size)
+                end = offset + len(chunk) - 1
+                try:
+                    response = self.http.put(
+                        session_uri,
+                        headers=self._headers({"Content-Range": f"bytes {offset}-{end}/{total}"}),
+                        data=chunk,
+                        timeout=300
+                    )
+                except requests.RequestException as e:
+                    response, error = None, e
+                else:
+                    error = None
+
+                if response is not None and response.status_code in (200, 201):
+                    done = response
+                elif response is not None and response.status_code == 308:
+                    offset = _uploaded_bytes(response)
+                    retries = 0
+                elif response is None or response.status_code in RETRY_STATUSES:
+                    offset, done, retries = self._recover(
+                        video_path, session_uri, total, offset, retries, error or response.status_code
+                    )
+                else:
+                    raise UploadError(f"Upload failed with HTTP {response.status_code}: {response.text[:200]}")
+
+        state_path.unlink(missing_ok=True)
+        video_id = done.json().get("id")
+        elapsed = time.perf_counter() - started
+        print(f"✅ API upload finished: {video_path} ({total / 1e6:.1f} MB in {elapsed:.1f}s)")
+        return f"https://youtu.be/{video_id}" if video_id else None
+
+
+# -----------------------------
+# Uploader backend interface
+# -----------------------------
+_default_uploader = None
+
+
+def get_uploader():
+    global _default_uploader
+    if _default_uploader is None:
+        _default_uploader = ResumableUploader()
+    return _default_uploader
+
+
+async def upload_video(video_path: str, title: str, description: str, tags: Optional[List[str]] = None):
+    """Same signature as the Playwright uploaders; runs the blocking upload off the event loop"""
+    return await asyncio.to_thread(get_uploader().upload, video_path, title, description, tags)
+
+
+class ApiUploaderSession:
+    """Drop-in for UploaderSession in upload_many: `run(fn, *args)` calls fn(uploader, *args)"""
+
+    def __init__(self, *args, **kwargs):
+        self.uploader = get_uploader()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        pass
+
+    async def run(self, fn, *args, **kwargs):
+        return await fn(self.uploader, *args, **kwargs)
+
+
+async def upload_with_api(uploader: ResumableUploader, video_path: str, title: str, description: str, tags=None):
+    """upload_many-compatible upload function for the API backend"""
+    return await asyncio.to_thread(uploader.upload, video_path, title, description, tags)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Upload a video with the YouTube Data API (resumable)")
+    parser.add_argument("--video", required=True, help="Path to the video file")
+    parser.add_argument("--title", required=True, help="Video title")
+    parser.add_argument("--description", default="", help="Video description")
+    parser.add_argument("--tags", nargs="*", help="Optional tags")
+    args = parser.parse_args()
+
+    print(asyncio.run(upload_video(args.video, args.title, args.description, args.tags)))
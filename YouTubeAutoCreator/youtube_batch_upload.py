@@ -1,71 +1,107 @@
+import os
 import asyncio
 from pathlib import Path
-from playwright.async_api import async_playwright
+from typing import Optional
+from upload_session import UploaderSession, upload_many, USER_DATA_DIR
+from upload_queue import UploadQueue, UPLOAD_QUEUE_DB
+from youtube_api_uploader import ApiUploaderSession, upload_with_api
+from upload_waits import watch_upload_response, wait_for_upload_complete, click_next_steps, click_when_enabled, wait_for_published
 
 # -----------------------------
 # Config
 # -----------------------------
 OUTPUT_DIR = Path("output")
-USER_DATA_DIR = Path("chrome_user_data")  # Persistent profile with saved login
+UPLOAD_URL = os.getenv("YOUTUBE_UPLOAD_URL", "https://www.youtube.com/upload")  # point at a mock page for testing
+UPLOAD_CONCURRENCY = int(os.getenv("UPLOAD_CONCURRENCY", "1"))
+VIDEO_LINK_SELECTOR = "ytcp-video-info a, .video-url-fadeable a"  # "Video link" shown in the upload dialog
+UPLOAD_BACKEND = os.getenv("UPLOAD_BACKEND", "browser")  # "browser" (Studio via Playwright) or "api" (YouTube Data API)
 
 # -----------------------------
 # Upload function
 # -----------------------------
+async def upload_on_page(page, video_path: str, title: str, description: str):
+    """Drive one upload on an already-open page"""
+    await page.goto(UPLOAD_URL, wait_until="networkidle")
+
+    # Upload file
+    file_input = page.locator("input[type='file']")
+    await file_input.wait_for(state="attached", timeout=60000)
+    upload_response = watch_upload_response(page)
+    await file_input.set_input_files(video_path)
+    print(f"⏳ Uploading: {video_path} ...")
+
+    # Fill title & description
+    await page.get_by_role("textbox", name="Add a title that describes your video").fill(title)
+    await page.get_by_role("textbox", name="Tell viewers about your video").fill(description)
+
+    # Wait until overlay disappears, then set audience
+    await page.wait_for_selector(".dialog-scrim", state="detached", timeout=60000)
+    await page.get_by_role("radio", name="No, it's not 'Made for Kids'").check()
+
+    # Click Next 3 times
+    await click_next_steps(page, "#next-button")
+
+    # Visibility = Public
+    public_radio = page.get_by_role("radio", name="Public")
+    await public_radio.wait_for(state="visible", timeout=60000)
+    await public_radio.check()
+
+    # Publish once the file is fully uploaded
+    await wait_for_upload_complete(page, upload_response)
+    try:
+        video_url = await page.get_attribute(VIDEO_LINK_SELECTOR, "href", timeout=10000)
+    except Exception:
+        video_url = None
+    await click_when_enabled(page, "#done-button", timeout=300000)
+    await wait_for_published(page)
+
+    print(f"✅ Uploaded successfully: {video_path} {video_url or ''}")
+    return video_url
+
+
+async def upload_video(video_path: str, title: str, description: str, session: Optional[UploaderSession] = None):
+    """Upload one video, reusing `session`'s browser when given"""
+    if session is not None:
+        return await session.run(upload_on_page, video_path, title, description)
+    async with UploaderSession() as own_session:
+        return await own_session.run(upload_on_page, video_path, title, description)
+
+
 # -----------------------------
-# Upload function
+# Backends
 # -----------------------------
-async def upload_video(video_path: str, title: str, description: str):
-    async with async_playwright() as p:
-        browser = await p.chromium.launch_persistent_context(
-            user_data_dir=str(USER_DATA_DIR.absolute()),
-            channel="chrome",
-            headless=False,
-            args=["--start-maximized", "--disable-blink-features=AutomationControlled"]
-        )
-        page = await browser.new_page()
-        await page.goto("https://www.youtube.com/upload", wait_until="networkidle")
-        await page.wait_for_timeout(3000)
-
-        # Upload file
-        file_input = page.locator("input[type='file']")
-        await file_input.set_input_files(video_path)
-        print(f"⏳ Uploading: {video_path} ...")
-
-        # Fill title & description
-        await page.get_by_role("textbox", name="Add a title that describes your video").fill(title)
-        await page.get_by_role("textbox", name="Tell viewers about your video").fill(description)
-
-        # Wait until overlay disappears, then set audience
-        await page.wait_for_selector(".dialog-scrim", state="detached", timeout=60000)
-        await page.get_by_role("radio", name="No, it's not 'Made for Kids'").check()
-
-        # Click Next 3 times
-        for _ in range(3):
-            next_btn = page.get_by_role("button", name="Next")
-            await next_btn.wait_for(state="visible", timeout=60000)
-            await next_btn.click()
-            await page.wait_for_timeout(2000)
-
-        # Visibility = Public
-        public_radio = page.get_by_role("radio", name="Public")
-        await public_radio.wait_for(state="visible", timeout=60000)
-        await public_radio.check()
-
-        # Publish
-        publish_btn = page.get_by_role("button", name="Publish")
-        await publish_btn.wait_for(state="enabled", timeout=300000)
-        await publish_btn.click()
-
-        print(f"✅ Uploaded successfully: {video_path}")
-        await browser.close()
+def upload_backend(backend: str = UPLOAD_BACKEND):
+    """(session class, upload function) for the "browser" or "api" backend"""
+    if backend == "api":
+        return ApiUploaderSession, upload_with_api
+    return UploaderSession, upload_on_page
 
 
+def tracked_upload(queue: UploadQueue, upload_fn):
+    """Wrap `upload_fn` so each attempt is recorded in the upload queue; job args gain a trailing job_id"""
+    async def upload_job(page, video_path, title, description, job_id):
+        queue.mark_uploading(job_id)
+        try:
+            video_url = await upload_fn(page, video_path, title, description)
+        except Exception as e:
+            queue.mark_failed(job_id, e)
+            raise
+        queue.mark_done(job_id, video_url)
+        return video_url
+    return upload_job
 
 
 # -----------------------------
 # Batch upload
 # -----------------------------
-async def batch_upload():
+async def batch_upload(storage_file: Optional[Path] = None, concurrency: int = UPLOAD_CONCURRENCY, retries: int = 2,
+                       queue_path: Path = UPLOAD_QUEUE_DB, backend: str = UPLOAD_BACKEND):
+    """Upload every new mp4 in output/ through the persistent upload queue.
+
+    Already-published content is skipped and interrupted jobs resume, so
+    re-running a batch is safe. With concurrency > 1, several pages upload at once.
+    backend="api" uploads through the Data API instead of driving Studio.
+    """
     if not OUTPUT_DIR.exists():
         print("❌ Output folder not found")
         return
@@ -75,17 +111,48 @@ async def batch_upload():
         print("❌ No video files found in output folder")
         return
 
-    for video in videos:
-        title = video.stem.replace("_", " ")
-        description = f"Automated upload for {title}"
-        try:
-            await upload_video(str(video), title, description)
-        except Exception as e:
-            print(f"❌ Failed to upload {video.name}: {e}")
+    account = Path(storage_file).stem if storage_file else "default"
+    with UploadQueue(queue_path, account) as queue:
+        for video in videos:
+            title = video.stem.split("__")[0].replace("_", " ")  # drop the "__<profile>_src<n>" settings suffix
+            # Hashing and SQLite writes stay off the event loop (the bot awaits this)
+            await asyncio.to_thread(queue.enqueue, video, title, f"Automated upload for {title}")
+
+        pending = queue.pending()
+        if not pending:
+            print("✅ Nothing new to upload")
+            queue.print_stats()
+            return []
+
+        session_cls, upload_fn = upload_backend(backend)
+        upload_job = tracked_upload(queue, upload_fn)
+
+        jobs = [(job["path"], job["title"], job["description"], job["id"]) for job in pending]
+
+        # One browser (or one pooled HTTP session) for the whole batch
+        async with session_cls(USER_DATA_DIR, storage_file=storage_file) as session:
+            results = await upload_many(session, jobs, upload_job, concurrency=concurrency, retries=retries)
+        queue.print_stats()
+        return results
 
 
 # -----------------------------
 # Main
 # -----------------------------
 if __name__ == "__main__":
-    asyncio.run(batch_upload())
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Upload every video in the output folder")
+    parser.add_argument("--concurrency", type=int, default=UPLOAD_CONCURRENCY, help="Parallel upload pages")
+    parser.add_argument("--retries", type=int, default=2, help="Extra attempts per video")
+    parser.add_argument("--queue", default=str(UPLOAD_QUEUE_DB), help="Upload queue database")
+    parser.add_argument("--stats", action="store_true", help="Only print queue stats")
+    parser.add_argument("--backend", choices=["browser", "api"], default=UPLOAD_BACKEND, help="Upload backend")
+    args = parser.parse_args()
+
+    if args.stats:
+        with UploadQueue(args.queue) as queue:
+            queue.print_stats()
+    else:
+        asyncio.run(batch_upload(concurrency=args.concurrency, retries=args.retries, queue_path=args.queue,
+                                 backend=args.backend))
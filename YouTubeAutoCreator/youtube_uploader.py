@@ -4,6 +4,8 @@ import os
 from pathlib import Path
 from typing import Optional, List
 from playwright.async_api import async_playwright, Page, BrowserContext
+from session_validator import validator
+from upload_waits import watch_upload_response, wait_for_upload_complete, click_next_steps, click_when_enabled, wait_for_published
 
 COOKIE_FILE = Path("youtube_cookies.json")
 USER_DATA_DIR = Path("chrome_user_data").absolute()
@@ -53,6 +55,7 @@ async def youtube_login(email: Optional[str] = None, password: Optional[str] = N
         cookies = await browser.cookies()
         with open(COOKIE_FILE, "w") as f:
             json.dump(cookies, f)
+        validator.invalidate(str(COOKIE_FILE))
         print("✅ Login successful, cookies saved")
         return True
 
@@ -65,20 +68,8 @@ async def youtube_login(email: Optional[str] = None, password: Optional[str] = N
 
 
 async def check_cookies_valid() -> bool:
-    """Check if saved cookies are still valid."""
-    if not COOKIE_FILE.exists():
-        return False
-
-    browser = await launch_browser(headless=True)
-    page = await browser.new_page()
-    try:
-        await page.goto("https://studio.youtube.com", timeout=30000)
-        await page.wait_for_selector("#avatar-btn", timeout=10000)
-        return True
-    except:
-        return False
-    finally:
-        await browser.close()
+    """Check if saved cookies are still valid (expiry timestamps, then one HTTP probe; no browser)"""
+    return await validator.ais_valid(str(COOKIE_FILE), COOKIE_FILE)
 
 
 async def upload_video(video_path: str, title: str, description: str, tags: Optional[List[str]] = None):
@@ -98,6 +89,7 @@ async def upload_video(video_path: str, title: str, description: str, tags: Opti
         # Upload video
         print(f"⏳ Uploading video: {video_path}")
         file_input = await page.wait_for_selector("input[type='file']", timeout=60000)
+        upload_response = watch_upload_response(page)
         await file_input.set_input_files(video_path)
 
         # Fill title
@@ -117,21 +109,18 @@ async def upload_video(video_path: str, title: str, description: str, tags: Opti
             except Exception as e:
                 print(f"⚠️ Couldn't add tags: {e}")
 
-        # Wait for upload and processing (adjust timing)
-        await asyncio.sleep(60)
+        # Wait until YouTube reports the upload finished
+        await wait_for_upload_complete(page, upload_response)
 
         # Click "Next" 3 times
-        for _ in range(3):
-            next_btn = await page.wait_for_selector("tp-yt-paper-button#next-button")
-            await next_btn.click()
-            await asyncio.sleep(2)
+        await click_next_steps(page, "#next-button")
 
         # Set Public and publish
         public_btn = await page.wait_for_selector("tp-yt-paper-radio-button[name='PUBLIC']")
         await public_btn.click()
 
-        publish_btn = await page.wait_for_selector("tp-yt-paper-button#done-button")
-        await publish_btn.click()
+        await click_when_enabled(page, "#done-button")
+        await wait_for_published(page)
 
         print(f"✅ Video uploaded successfully: {video_path}")
 
@@ -4,6 +4,8 @@ import os
 from pathlib import Path
 from typing import Optional
 from playwright.async_api import async_playwright
+from session_validator import validator
+from upload_waits import watch_upload_response, wait_for_upload_complete, click_next_steps, click_when_enabled, wait_for_published
 
 COOKIE_FILE = Path("youtube_cookies.json")
 USER_DATA_DIR = str(Path("chrome_user_data").absolute())  # persistent profile dir
@@ -58,6 +60,7 @@ async def youtube_login(email: Optional[str] = None, password: Optional[str] = N
                 cookies = await browser.cookies()
                 with open(COOKIE_FILE, "w") as f:
                     json.dump(cookies, f)
+                validator.invalidate(str(COOKIE_FILE))
                 return True
             except Exception as e:
                 print(f"\n❌ Login detection failed: {str(e)}")
@@ -66,24 +69,8 @@ async def youtube_login(email: Optional[str] = None, password: Optional[str] = N
             await browser.close()
 
 async def check_cookies_valid() -> bool:
-    """Check if saved cookies are still valid"""
-    if not COOKIE_FILE.exists():
-        return False
-    async with async_playwright() as p:
-        browser = await p.chromium.launch_persistent_context(
-            user_data_dir=USER_DATA_DIR,
-            channel="chrome",
-            headless=True
-        )
-        page = await browser.new_page()
-        try:
-            await page.goto("https://studio.youtube.com", timeout=30000)
-            await page.wait_for_selector("#avatar-btn", timeout=10000)
-            return True
-        except:
-            return False
-        finally:
-            await browser.close()
+    """Check if saved cookies are still valid (expiry timestamps, then one HTTP probe; no browser)"""
+    return await validator.ais_valid(str(COOKIE_FILE), COOKIE_FILE)
 
 async def upload_video(video_path: str, title: str, description: str, tags: list[str] = None):
     """Upload video using persistent Chrome session (manual login once)."""
@@ -112,6 +99,7 @@ async def upload_video(video_path: str, title: str, description: str, tags: list
         # Upload video file
         print(f"⏳ Uploading video: {video_path}")
         file_input = await page.wait_for_selector("input[type='file']", timeout=60000)
+        upload_response = watch_upload_response(page)
         await file_input.set_input_files(video_path)
 
         # Fill title
@@ -131,21 +119,18 @@ async def upload_video(video_path: str, title: str, description: str, tags: list
             except Exception as e:
                 print(f"⚠️ Couldn't add tags: {e}")
 
-        # Wait for processing (adjust if too long/short)
-        await asyncio.sleep(90)
+        # Wait until YouTube reports the upload finished
+        await wait_for_upload_complete(page, upload_response)
 
         # Click "Next" 3 times
-        for _ in range(3):
-            next_btn = await page.wait_for_selector("tp-yt-paper-button#next-button")
-            await next_btn.click()
-            await asyncio.sleep(2)
+        await click_next_steps(page, "#next-button")
 
         # Set visibility to Public and publish
         public_btn = await page.wait_for_selector("tp-yt-paper-radio-button[name='PUBLIC']")
         await public_btn.click()
 
-        publish_btn = await page.wait_for_selector("tp-yt-paper-button#done-button")
-        await publish_btn.click()
+        await click_when_enabled(page, "#done-button")
+        await wait_for_published(page)
 
         print(f"✅ Video uploaded successfully: {video_path}")
         await browser.close()